@@ -0,0 +1,144 @@
+# accounts/avatars.py
+"""
+Avatar pipeline: on upload the original is re-encoded without metadata
+and fixed-size square renditions are written next to it, named after a
+content hash so they can be served with far-future cache headers.
+"""
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+AVATAR_SIZES = (60, 120, 256)
+
+# Originals are kept for re-rendering, but never larger than this
+ORIGINAL_MAX_SIZE = 1024
+
+# Uploads above this many pixels are refused before they are decoded
+MAX_PIXELS = 40_000_000
+
+if features.check("webp"):
+    RENDITION_FORMAT, RENDITION_EXT = "WEBP", "webp"
+else:
+    RENDITION_FORMAT, RENDITION_EXT = "JPEG", "jpg"
+
+
+def avatar_dir(user_id):
+    return f"avatars/user_{user_id}"
+
+
+def rendition_name(user_id, key, size):
+    return f"{avatar_dir(user_id)}/avatar_{key}_{size}.{RENDITION_EXT}"
+
+
+def pick_size(size):
+    """Smallest rendition at least ``size`` px wide (largest if none is)."""
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def _cache_key(user_id):
+    return f"accounts:avatar_key:{user_id}"
+
+
+def get_avatar_key(user):
+    """Rendition key for ``user`` ("" = no avatar), cached between pages."""
+    key = cache.get(_cache_key(user.pk))
+    if key is None:
+        from .models import Profile
+
+        key = (
+            Profile.objects.filter(user=user)
+            .values_list("avatar_key", flat=True)
+            .first()
+        ) or ""
+        cache.set(_cache_key(user.pk), key, None)
+    return key
+
+
+def _encode(img, fmt, **options):
+    buf = BytesIO()
+    # No exif/icc/info passed through: metadata is stripped
+    img.save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def _delete_stale(storage, user_id, keep):
+    directory = avatar_dir(user_id)
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        path = posixpath.join(directory, name)
+        if path not in keep:
+            storage.delete(path)
+
+
+def process_avatar(profile):
+    """
+    Sanitize ``profile.avatar`` and (re)build its renditions. Clears the
+    renditions when the avatar was removed. Saves ``avatar``/``avatar_key``.
+    """
+    field = profile.avatar
+    storage = field.storage
+    user_id = profile.user_id
+
+    if not field:
+        _delete_stale(storage, user_id, keep=set())
+        profile.avatar_key = ""
+        profile.save(update_fields=["avatar", "avatar_key"])
+        cache.delete(_cache_key(user_id))
+        return
+
+    # Hash in chunks and let Pillow read from the file: the upload is
+    # never held in memory as a whole
+    digest = hashlib.sha256()
+    with field.open("rb") as fh:
+        for chunk in fh.chunks():
+            digest.update(chunk)
+        fh.seek(0)
+
+        img = Image.open(fh)
+        if img.width * img.height > MAX_PIXELS:
+            raise ValueError(f"avatar is {img.width}x{img.height}, over {MAX_PIXELS} pixels")
+        # JPEG can decode straight at a fraction of its size
+        img.draft("RGB", (ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+    key = digest.hexdigest()[:16]
+
+    # Clean, size-capped original
+    original = img.copy()
+    original.thumbnail((ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE), Image.LANCZOS)
+    original_name = f"{avatar_dir(user_id)}/original_{key}.{RENDITION_EXT}"
+    keep = {original_name}
+
+    if not storage.exists(original_name):
+        storage.save(
+            original_name,
+            ContentFile(_encode(original, RENDITION_FORMAT, quality=90)),
+        )
+
+    for size in AVATAR_SIZES:
+        name = rendition_name(user_id, key, size)
+        keep.add(name)
+        if storage.exists(name):
+            continue
+        thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+        if RENDITION_FORMAT == "JPEG":
+            thumb = thumb.convert("RGB")
+        storage.save(name, ContentFile(_encode(thumb, RENDITION_FORMAT, quality=80)))
+
+    # The uploaded file (with its metadata) is replaced by the clean copy
+    _delete_stale(storage, user_id, keep)
+
+    profile.avatar.name = original_name
+    profile.avatar_key = key
+    profile.save(update_fields=["avatar", "avatar_key"])
+    cache.delete(_cache_key(user_id))
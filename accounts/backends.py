@@ -0,0 +1,47 @@
+# accounts/backends.py
+"""
+ModelBackend whose ``get_user`` (called by AuthenticationMiddleware on
+every request) is served from a short-lived cache entry. Saving or
+deleting a User drops the entry (see signals.py). ``QuerySet.update()``
+sends no signals: code that changes users that way must call
+``invalidate_cached_users`` with the ids it touched, or the old row is
+served for up to AUTH_USER_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+
+def _cache_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+def invalidate_cached_users(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            # Stop here: the plain ModelBackend listed after this one
+            # would only hash the same wrong password a second time
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        key = _cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        # Inactive users stay rejected even while cached
+        return user if self.user_can_authenticate(user) else None
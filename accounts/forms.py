@@ -1,6 +1,10 @@
 # accounts/forms.py
 from django import forms
+from django.contrib.auth.forms import PasswordResetForm
 from django.contrib.auth.models import User
+from django.template import loader
+from .avatars import MAX_PIXELS
+from .mail import enqueue_email
 from .models import Profile
 
 class SignupForm(forms.ModelForm):
@@ -30,3 +34,28 @@ class ProfileForm(forms.ModelForm):
     class Meta:
         model = Profile
         fields = ["avatar", "bio"]
+
+    def clean_avatar(self):
+        avatar = self.cleaned_data.get("avatar")
+        # Pillow image attached by ImageField validation
+        image = getattr(avatar, "image", None)
+        if image is not None and image.width * image.height > MAX_PIXELS:
+            raise forms.ValidationError("That image is too large; please upload a smaller one.")
+        return avatar
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Password reset that queues the email instead of sending inline."""
+
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = "".join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = ""
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+
+        enqueue_email(
+            subject, body, to_email, from_email=from_email, html_body=html_body
+        )
@@ -0,0 +1,127 @@
+# accounts/mail.py
+"""
+Database-backed outbound email queue.
+
+Views call enqueue_email(); the ``send_queued_email`` management command
+delivers due messages and retries failures with exponential backoff.
+
+A worker first claims a batch in a short transaction: each row's
+attempt is counted and its next_attempt_at is pushed out by
+EMAIL_QUEUE_CLAIM_SECONDS, so no other worker picks it up. It then sends
+outside any transaction and records each row's outcome as soon as that
+message is done. If the worker dies, only the message in flight can go
+out twice; the rest of its claim becomes due again when the claim
+expires.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_email(subject, body, to, from_email=None, html_body=""):
+    """Queue one message for the worker; returns the OutboundEmail row."""
+    return OutboundEmail.objects.create(
+        to=to,
+        subject=subject,
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email or "",
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base * 2^(attempts-1), capped."""
+    base = _setting("EMAIL_QUEUE_RETRY_BASE_SECONDS", 30)
+    cap = _setting("EMAIL_QUEUE_RETRY_MAX_SECONDS", 60 * 60)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def _build(row, connection):
+    msg = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or None,
+        to=[row.to],
+        connection=connection,
+    )
+    if row.html_body:
+        msg.attach_alternative(row.html_body, "text/html")
+    return msg
+
+
+def _claim(batch_size):
+    """Lock, claim and commit up to ``batch_size`` due rows."""
+    now = timezone.now()
+    lease = timedelta(seconds=_setting("EMAIL_QUEUE_CLAIM_SECONDS", 5 * 60))
+    with transaction.atomic():
+        due = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        for row in due:
+            row.attempts += 1
+            row.claimed_at = now
+            row.next_attempt_at = now + lease
+        OutboundEmail.objects.bulk_update(due, ["attempts", "claimed_at", "next_attempt_at"])
+    return due
+
+
+def _record_failure(row, exc, max_attempts):
+    row.last_error = f"{type(exc).__name__}: {exc}"
+    if row.attempts >= max_attempts:
+        row.status = OutboundEmail.STATUS_FAILED
+    else:
+        row.next_attempt_at = timezone.now() + retry_delay(row.attempts)
+    row.save(update_fields=["status", "next_attempt_at", "last_error"])
+
+
+def send_due_emails(batch_size=50):
+    """
+    Deliver up to ``batch_size`` due messages over one SMTP connection.
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can run side by side. Returns (sent, failed) counts.
+    """
+    max_attempts = _setting("EMAIL_QUEUE_MAX_ATTEMPTS", 5)
+    sent = failed = 0
+
+    due = _claim(batch_size)
+    if not due:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        open_error = None
+    except Exception as exc:
+        # Server unreachable: count an attempt against every claimed row
+        open_error = exc
+
+    try:
+        for row in due:
+            try:
+                if open_error is not None:
+                    raise open_error
+                _build(row, connection).send()
+            except Exception as exc:
+                _record_failure(row, exc, max_attempts)
+                failed += 1
+            else:
+                row.status = OutboundEmail.STATUS_SENT
+                row.sent_at = timezone.now()
+                row.last_error = ""
+                row.save(update_fields=["status", "sent_at", "last_error"])
+                sent += 1
+    finally:
+        connection.close()
+
+    return sent, failed
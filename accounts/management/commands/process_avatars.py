@@ -0,0 +1,32 @@
+# accounts/management/commands/process_avatars.py
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import process_avatar
+from accounts.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Build avatar renditions for profiles uploaded before the pipeline existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every avatar, not only those missing renditions.",
+        )
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(avatar="").exclude(avatar__isnull=True)
+        if not options["all"]:
+            profiles = profiles.filter(avatar_key="")
+
+        done = 0
+        for profile in profiles.iterator():
+            try:
+                process_avatar(profile)
+            except Exception as exc:
+                self.stderr.write(f"profile {profile.pk}: {exc}")
+            else:
+                done += 1
+
+        self.stdout.write(f"processed {done} avatar(s)")
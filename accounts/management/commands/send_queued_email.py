@@ -0,0 +1,33 @@
+# accounts/management/commands/send_queued_email.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.mail import send_due_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound email (run once, or keep polling with --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling the queue every --interval seconds.",
+        )
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            # Drain everything that is due before sleeping
+            while True:
+                sent, failed = send_due_emails(options["batch_size"])
+                if sent or failed:
+                    self.stdout.write(f"sent={sent} failed={failed}")
+                if sent + failed < options["batch_size"]:
+                    break
+
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
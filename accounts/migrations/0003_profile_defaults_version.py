@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_profile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='defaults_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_key',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
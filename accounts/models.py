@@ -1,6 +1,7 @@
 # accounts/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 def user_avatar_path(instance, filename):
     return f"avatars/user_{instance.user.id}/{filename}"
@@ -8,8 +9,62 @@ def user_avatar_path(instance, filename):
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     avatar = models.ImageField(upload_to=user_avatar_path, blank=True, null=True)
+    # Content hash naming the avatar renditions ("" = none generated)
+    avatar_key = models.CharField(max_length=32, blank=True, default="")
     bio = models.TextField(blank=True, null=True)
 
+    # Version of the dashboard default goals/tasks catalog this user was
+    # last seeded with (0 = never seeded)
+    defaults_version = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return f"{self.user.username} Profile"
 
+
+
+class OutboundEmail(models.Model):
+    """
+    Outgoing mail queued by requests and delivered by the
+    ``send_queued_email`` worker, so SMTP latency never blocks a request.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255, blank=True)
+
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # When a worker last claimed the row for sending (see accounts.mail)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outbound_email_due_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to} ({self.status})"
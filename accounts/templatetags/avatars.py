@@ -0,0 +1,24 @@
+# accounts/templatetags/avatars.py
+from django import template
+from django.templatetags.static import static
+from django.urls import reverse
+
+from accounts.avatars import get_avatar_key, pick_size
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(user, size=60):
+    """
+    URL of the smallest avatar rendition covering ``size`` px, or the
+    default placeholder when the user has none.
+    """
+    if not user.is_authenticated:
+        return static("img/user.avif")
+
+    key = get_avatar_key(user)
+    if not key:
+        return static("img/user.avif")
+
+    return reverse("avatar", args=[user.pk, key, pick_size(size)])
@@ -1,3 +1,261 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .avatars import AVATAR_SIZES, rendition_name
+from .backends import invalidate_cached_users
+from .mail import enqueue_email, send_due_emails
+from .models import OutboundEmail, Profile
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class EmailQueueTests(TestCase):
+
+    def test_signup_queues_activation_email_without_sending(self):
+        response = self.client.post(reverse("signup"), {
+            "username": "newbie",
+            "email": "newbie@example.com",
+            "password1": "s3cret-pass",
+            "password2": "s3cret-pass",
+        })
+
+        self.assertRedirects(response, reverse("login"), fetch_redirect_response=False)
+        self.assertEqual(len(mail.outbox), 0)
+
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.to, "newbie@example.com")
+        self.assertIn("/accounts/activate/", queued.body)
+
+        call_command("send_queued_email", stdout=mock.Mock())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["newbie@example.com"])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutboundEmail.STATUS_SENT)
+
+    def test_password_reset_is_queued(self):
+        User.objects.create_user("alice", email="alice@example.com", password="pw")
+
+        self.client.post(reverse("password_reset"), {"email": "alice@example.com"})
+
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.subject, "Reset your password")
+        self.assertIn("/accounts/password-reset-confirm/", queued.body)
+
+        send_due_emails()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_QUEUE_MAX_ATTEMPTS=2, EMAIL_QUEUE_RETRY_BASE_SECONDS=30)
+    def test_failures_back_off_then_give_up(self):
+        row = enqueue_email("Hi", "Body", "bob@example.com")
+
+        with mock.patch(
+            "django.core.mail.EmailMultiAlternatives.send",
+            side_effect=ConnectionError("smtp down"),
+        ):
+            self.assertEqual(send_due_emails(), (0, 1))
+            row.refresh_from_db()
+            self.assertEqual(row.status, OutboundEmail.STATUS_PENDING)
+            self.assertGreater(row.next_attempt_at, timezone.now())
+            self.assertIn("smtp down", row.last_error)
+
+            # Not due yet: nothing is retried
+            self.assertEqual(send_due_emails(), (0, 0))
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(send_due_emails(), (0, 1))
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(row.attempts, 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+    def test_sends_outside_the_claim_transaction(self):
+        enqueue_email("Hi", "Body", "bob@example.com")
+        depth = len(connection.atomic_blocks)
+        seen = []
+
+        with mock.patch(
+            "django.core.mail.EmailMultiAlternatives.send",
+            side_effect=lambda: seen.append(len(connection.atomic_blocks)),
+        ):
+            send_due_emails()
+
+        self.assertEqual(seen, [depth])
+
+    def test_worker_dying_mid_batch_resends_only_unsent_rows(self):
+        first = [enqueue_email("Hi", "Body", f"user{n}@example.com") for n in range(3)][0]
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 2:
+                raise SystemExit  # the worker is killed while sending
+            return 1
+
+        with mock.patch("django.core.mail.EmailMultiAlternatives.send", side_effect=send):
+            with self.assertRaises(SystemExit):
+                send_due_emails()
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutboundEmail.STATUS_SENT)
+        # The rest stay claimed until the claim expires
+        self.assertEqual(send_due_emails(), (0, 0))
+
+        OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING).update(
+            next_attempt_at=timezone.now()
+        )
+        self.assertEqual(send_due_emails(), (2, 0))
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox), ["user1@example.com", "user2@example.com"]
+        )
+
+
+# locmem stands in for the shared (file/Redis) cache used in deployments
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    AUTHENTICATION_BACKENDS=[
+        "accounts.backends.CachedModelBackend",
+        "django.contrib.auth.backends.ModelBackend",
+    ],
+)
+class CachedAuthTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("carol", password="pw")
+        self.client.login(username="carol", password="pw")
+
+    def auth_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        return [
+            q["sql"] for q in ctx.captured_queries
+            if 'FROM "django_session"' in q["sql"]
+            or ('FROM "auth_user"' in q["sql"] and '"auth_user"."id" =' in q["sql"])
+        ]
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        self.client.get(reverse("home"))
+
+        self.assertEqual(self.auth_queries(), [])
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.client.get(reverse("home"))
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assert_logged_out()
+
+    def test_queryset_updates_invalidate_explicitly(self):
+        self.client.get(reverse("home"))
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_cached_users([self.user.pk])
+
+        self.assert_logged_out()
+
+    def test_sessions_from_the_plain_model_backend_stay_logged_in(self):
+        self.client.logout()
+        self.client.force_login(self.user, backend="django.contrib.auth.backends.ModelBackend")
+
+        self.assertEqual(self.client.get(reverse("home")).status_code, 200)
+
+    def test_wrong_password_is_checked_once(self):
+        self.client.logout()
+        with mock.patch.object(User, "check_password", autospec=True, return_value=False) as check:
+            self.assertFalse(self.client.login(username="carol", password="nope"))
+
+        self.assertEqual(check.call_count, 1)
+
+    def assert_logged_out(self):
+        response = self.client.get(reverse("home"))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('home')}",
+                             fetch_redirect_response=False)
+
+
+class AvatarTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media = override_settings(MEDIA_ROOT=self.media.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user("dora", password="pw")
+        self.client.force_login(self.user)
+
+    def jpeg_with_exif(self, size=(40, 20)):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        exif[0x0112] = 6  # orientation: rotate 90°
+        buf = BytesIO()
+        Image.new("RGB", size, "red").save(buf, "JPEG", exif=exif.tobytes())
+        return SimpleUploadedFile("photo.jpg", buf.getvalue(), content_type="image/jpeg")
+
+    def upload(self, upload):
+        return self.client.post(reverse("profile"), {"avatar": upload, "bio": ""})
+
+    def test_upload_builds_clean_renditions(self):
+        self.upload(self.jpeg_with_exif())
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertTrue(profile.avatar_key)
+
+        with default_storage.open(profile.avatar.name) as fh:
+            original = Image.open(fh)
+            self.assertEqual(original.size, (20, 40))  # EXIF rotation applied
+            self.assertEqual(dict(original.getexif()), {})
+
+        for size in AVATAR_SIZES:
+            name = rendition_name(self.user.pk, profile.avatar_key, size)
+            with default_storage.open(name) as fh:
+                rendition = Image.open(fh)
+                self.assertEqual(rendition.size, (size, size))
+                self.assertEqual(dict(rendition.getexif()), {})
+
+        # The raw upload (with its metadata) is gone
+        _, files = default_storage.listdir(f"avatars/user_{self.user.pk}")
+        self.assertNotIn("photo.jpg", files)
+
+    def test_avatar_view_is_cached_for_a_year(self):
+        self.upload(self.jpeg_with_exif())
+        key = Profile.objects.get(user=self.user).avatar_key
+
+        response = self.client.get(reverse("avatar", args=[self.user.pk, key, 60]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, max-age=31536000, immutable")
+        self.assertEqual(
+            self.client.get(reverse("avatar", args=[self.user.pk, key, 61])).status_code, 404
+        )
+        self.assertEqual(
+            self.client.get(reverse("avatar", args=[self.user.pk, "0" * 16, 60])).status_code, 404
+        )
+
+    def test_oversized_images_are_refused(self):
+        with mock.patch("accounts.forms.MAX_PIXELS", 100):
+            response = self.upload(self.jpeg_with_exif())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("avatar", response.context["form"].errors)
+        self.assertEqual(Profile.objects.get(user=self.user).avatar_key, "")
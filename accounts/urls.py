@@ -1,6 +1,7 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
+from .forms import QueuedPasswordResetForm
 
 urlpatterns = [
     # ------------------------
@@ -32,6 +33,7 @@ urlpatterns = [
     path(
         "password-reset/",
         auth_views.PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm,
             template_name="accounts/password_reset.html",
             email_template_name="accounts/password_reset_email.html",
             subject_template_name="accounts/password_reset_subject.txt",
@@ -67,4 +69,9 @@ urlpatterns = [
     # Profile
     # ------------------------
     path("profile/", views.profile_view, name="profile"),
+    path(
+        "avatar/<int:user_id>/<slug:key>/<int:size>/",
+        views.avatar_view,
+        name="avatar",
+    ),
 ]
@@ -10,8 +10,12 @@ from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.contrib.auth import logout
 from django.shortcuts import redirect
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
 
+from .avatars import AVATAR_SIZES, process_avatar, rendition_name
 from .forms import SignupForm, ProfileForm
+from .mail import enqueue_email
 from .tokens import account_activation_token
 
 
@@ -27,7 +31,7 @@ def signup_view(request):
             user.set_password(form.cleaned_data["password1"])
             user.save()
 
-            # Send activation email
+            # Queue activation email (delivered by send_queued_email)
             current_site = get_current_site(request)
             subject = "Activate Your Account"
             message = render_to_string("accounts/activation_email.html", {
@@ -36,7 +40,7 @@ def signup_view(request):
                 "uid": urlsafe_base64_encode(force_bytes(user.pk)),
                 "token": account_activation_token.make_token(user),
             })
-            user.email_user(subject, message)
+            enqueue_email(subject, message, user.email)
 
             messages.success(
                 request,
@@ -79,7 +83,9 @@ def profile_view(request):
     if request.method == "POST":
         form = ProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            profile = form.save()
+            if "avatar" in form.changed_data:
+                process_avatar(profile)
             messages.success(request, "Profile updated.")
             return redirect("profile")
     else:
@@ -87,6 +93,29 @@ def profile_view(request):
 
     return render(request, "accounts/profile.html", {"form": form})
 
+# -------------------------------
+# AVATAR RENDITIONS
+# -------------------------------
+@login_required
+def avatar_view(request, user_id, key, size):
+    """
+    Serve one avatar rendition. The content hash is part of the URL, so
+    the response never changes and can be cached for a year.
+    """
+    if size not in AVATAR_SIZES:
+        raise Http404("Unknown avatar size")
+
+    name = rendition_name(user_id, key, size)
+    try:
+        fh = default_storage.open(name, "rb")
+    except FileNotFoundError:
+        raise Http404("No such avatar")
+
+    response = FileResponse(fh)
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
 def logout_view(request):
     logout(request)
     return redirect("login")
\ No newline at end of file
@@ -0,0 +1,125 @@
+# dashboard/caching.py
+"""
+Per-user cache for the dashboard JSON list endpoints.
+
+Every user has a generation number in the cache. Write views bump it
+(see ``invalidates_dashboard_cache``). The ETag of each list is derived
+from the rows (max ``updated_at`` plus row count, one index-only query)
+and the generation. That validator is memoised under the generation, so
+a warm GET is answered with 304, or the cached body, without touching
+the database, and the payload is only rebuilt when the validator changes.
+
+Writes made where the generation cannot be bumped (the ``archive_notes``
+cron service, unless it shares the cache through redis) are seen once
+the memoised validator expires, DASHBOARD_VALIDATOR_TIMEOUT at most.
+"""
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def _timeout():
+    return getattr(settings, "DASHBOARD_API_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def _validator_timeout():
+    return getattr(settings, "DASHBOARD_VALIDATOR_TIMEOUT", 5 * 60)
+
+
+def _generation_key(user_id):
+    return f"dashboard:gen:{user_id}"
+
+
+def get_generation(user_id):
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so a flushed counter never reuses old keys
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(user_id):
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidates_dashboard_cache(view):
+    """Bump the user's generation after a successful write."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code < 400:
+            bump_generation(request.user.pk)
+        return response
+
+    return wrapper
+
+
+def _validator_key(name, user_id, generation):
+    return f"dashboard:validator:{name}:{user_id}:{generation}"
+
+
+def _validator(name, generation, rows):
+    """(etag, last_modified) for ``rows``, from max(updated_at) and the row count."""
+    # Count updated_at rather than pk so (user, updated_at) covers the
+    # whole query and it can run as an index-only scan
+    stats = rows.aggregate(last=Max("updated_at"), count=Count("updated_at"))
+    last = stats["last"]
+    stamp = int(last.timestamp() * 1_000_000) if last else 0
+    return f"{name}-{generation}-{stats['count']}-{stamp}", last
+
+
+def get_validator(name, user_id, generation, rows):
+    """``_validator`` memoised until the generation moves on or it times out."""
+    key = _validator_key(name, user_id, generation)
+    validator = cache.get(key)
+    if validator is None:
+        validator = _validator(name, generation, rows)
+        cache.set(key, validator, _validator_timeout())
+    return validator
+
+
+def cached_json_response(request, name, rows, build_payload):
+    """
+    JSON response for the ``name`` endpoint, whose payload is built from
+    ``rows`` (the user's rows): 304 if the client's validator is current,
+    else the cached body, else ``build_payload()`` (cached).
+    """
+    user_id = request.user.pk
+    generation = get_generation(user_id)
+    etag, last_modified = get_validator(name, user_id, generation, rows)
+
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag),
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        # Keyed on the validator, so a body is only rebuilt after a change
+        key = f"dashboard:{name}:{user_id}:{etag}"
+        body = cache.get(key)
+        if body is None:
+            body = json.dumps(build_payload(), cls=DjangoJSONEncoder)
+            cache.set(key, body, _timeout())
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = quote_etag(etag)
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Always revalidate; the memoised validator makes that cheap
+    response["Cache-Control"] = "private, no-cache"
+    return response
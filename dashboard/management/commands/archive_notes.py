@@ -0,0 +1,26 @@
+# dashboard/management/commands/archive_notes.py
+from django.core.management.base import BaseCommand
+
+from dashboard.notes import archive_completed_notes
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed notes untouched for DASHBOARD_NOTES_ARCHIVE_DAYS "
+        "out of the hot set into the archive tier."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Override DASHBOARD_NOTES_ARCHIVE_DAYS.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        archived = archive_completed_notes(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"archived {archived} note(s)")
@@ -0,0 +1,85 @@
+# dashboard/management/commands/benchmark_connections.py
+import statistics
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from productivityhub.perf import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection cost: a new connection per "
+        "request versus the configured reuse (CONN_MAX_AGE, health checks, pool)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def simulate(self, requests, **overrides):
+        """
+        Run ``requests`` request lifecycles (request_started, one query,
+        request_finished) with ``overrides`` applied to the connection
+        settings; Django opens/closes connections exactly as in a real view.
+        """
+        connection.close()
+        saved = {key: connection.settings_dict.get(key) for key in overrides}
+        connection.settings_dict.update(overrides)
+        timings = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                signals.request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                signals.request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            connection.settings_dict.update(saved)
+
+        timings.sort()
+        return {
+            "p50": percentile(timings, 50),
+            "p95": percentile(timings, 95),
+            "mean": statistics.fmean(timings),
+        }
+
+    def handle(self, *args, **opts):
+        settings_dict = connection.settings_dict
+        pooled = bool(settings_dict.get("OPTIONS", {}).get("pool"))
+        n = opts["requests"]
+
+        modes = []
+        if not pooled:
+            modes.append(("new connection per request", {"CONN_MAX_AGE": 0}))
+        configured = {
+            "CONN_MAX_AGE": settings_dict.get("CONN_MAX_AGE"),
+            "CONN_HEALTH_CHECKS": settings_dict.get("CONN_HEALTH_CHECKS"),
+        }
+        label = "pool" if pooled else (
+            f"configured (CONN_MAX_AGE={configured['CONN_MAX_AGE']}, "
+            f"health checks {'on' if configured['CONN_HEALTH_CHECKS'] else 'off'})"
+        )
+        modes.append((label, configured))
+        if not pooled and configured["CONN_MAX_AGE"] != 0:
+            modes.append(("persistent, no health checks", {
+                "CONN_MAX_AGE": configured["CONN_MAX_AGE"],
+                "CONN_HEALTH_CHECKS": False,
+            }))
+
+        self.stdout.write(f"{connection.vendor}, {n} requests per mode")
+        results = []
+        for label, overrides in modes:
+            stats = self.simulate(n, **overrides)
+            results.append((label, stats))
+            self.stdout.write(
+                f"{label:<58} p50 {stats['p50']:>7.3f} ms  "
+                f"p95 {stats['p95']:>7.3f} ms  mean {stats['mean']:>7.3f} ms"
+            )
+
+        if len(results) > 1:
+            saved_ms = results[0][1]["p50"] - results[1][1]["p50"]
+            self.stdout.write(f"connection setup per request (p50): {saved_ms:.3f} ms")
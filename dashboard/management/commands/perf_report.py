@@ -0,0 +1,86 @@
+# dashboard/management/commands/perf_report.py
+import glob
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from productivityhub.perf import log_path, percentile
+
+SORT_KEYS = ("p50", "p95", "p99", "queries", "count")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rank views from the PERF_MONITOR log by latency percentiles and "
+        "queries per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log",
+            default=None,
+            help=(
+                "Log to read (default PERF_LOG_PATH); the per-worker and "
+                "rotated files next to it are included."
+            ),
+        )
+        parser.add_argument("--sort", choices=SORT_KEYS, default="p95")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--min-requests",
+            type=int,
+            default=1,
+            help="Skip views with fewer samples than this.",
+        )
+
+    def read_records(self, path):
+        files = sorted(glob.glob(f"{path}.*"), reverse=True) + glob.glob(str(path))
+        if not files:
+            raise CommandError(f"No perf log at {path}; set PERF_MONITOR=1 first.")
+
+        for name in files:
+            with open(name) as fh:
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def handle(self, *args, **options):
+        by_view = defaultdict(list)
+        for record in self.read_records(options["log"] or log_path()):
+            by_view[record.get("view") or "<unresolved>"].append(record)
+
+        rows = []
+        for view, records in by_view.items():
+            if len(records) < options["min_requests"]:
+                continue
+            walls = sorted(r["wall_ms"] for r in records)
+            count = len(records)
+            rows.append({
+                "view": view,
+                "count": count,
+                "p50": percentile(walls, 50),
+                "p95": percentile(walls, 95),
+                "p99": percentile(walls, 99),
+                "db_ms": sum(r["db_ms"] for r in records) / count,
+                "queries": sum(r["queries"] for r in records) / count,
+                "max_queries": max(r["queries"] for r in records),
+                "similar": sum(r.get("similar", 0) for r in records) / count,
+            })
+
+        rows.sort(key=lambda r: r[options["sort"]], reverse=True)
+
+        header = (
+            f"{'view':<28} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+            f"{'db ms':>8} {'q/req':>6} {'max q':>6} {'n+1':>5}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows[: options["limit"]]:
+            self.stdout.write(
+                f"{r['view'][:28]:<28} {r['count']:>6} {r['p50']:>8.1f} "
+                f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['db_ms']:>8.1f} "
+                f"{r['queries']:>6.1f} {r['max_queries']:>6} {r['similar']:>5.1f}"
+            )
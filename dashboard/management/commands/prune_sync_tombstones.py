@@ -0,0 +1,18 @@
+# dashboard/management/commands/prune_sync_tombstones.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dashboard.models import Tombstone
+from dashboard.sync import tombstone_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete sync tombstones older than DASHBOARD_SYNC_TOMBSTONE_DAYS. "
+        "Clients holding older tokens get a full resync instead."
+    )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - tombstone_retention()
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"pruned {deleted} tombstone(s)")
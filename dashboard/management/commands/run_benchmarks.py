@@ -0,0 +1,112 @@
+# dashboard/management/commands/run_benchmarks.py
+import json
+import platform
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from productivityhub.benchmarks import (
+    CASES, Fixtures, case_names, compare, run_case, url_names,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every dashboard, messaging and projects URL through the test "
+        "client as a seeded user (see seed_perf_data), write latency "
+        "percentiles and query counts to JSON and compare with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default="perf_0")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--cold", action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument(
+            "--only", nargs="*",
+            help="Run only these cases (URL names or name:variant).",
+        )
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument("--baseline", help="Earlier output to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.25)
+        parser.add_argument(
+            "--fail-on-regression", action="store_true",
+            help="Fail (exit status 1) when the baseline comparison finds regressions.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            user = User.objects.get(username=opts["username"])
+        except User.DoesNotExist:
+            raise CommandError(
+                f"No user {opts['username']!r}; run manage.py seed_perf_data first."
+            )
+
+        missing = [n for n in url_names() if n not in CASES]
+        if missing:
+            raise CommandError(f"No benchmark case for: {', '.join(missing)}")
+        names = case_names()
+        if opts["only"]:
+            names = [n for n in names if n in opts["only"]]
+
+        client = Client()
+        client.force_login(user)
+        fixtures = Fixtures.for_user(user)
+
+        results = {
+            "meta": {
+                "created": datetime.now(dt_timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "username": user.username,
+                "iterations": opts["iterations"],
+                "cold_cache": opts["cold"],
+            },
+            "cases": {},
+        }
+
+        # The test client's host must be allowed whatever the deployment says
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in names:
+                try:
+                    case = run_case(
+                        client, fixtures, name,
+                        iterations=opts["iterations"],
+                        warmup=opts["warmup"],
+                        cold=opts["cold"],
+                    )
+                except LookupError as exc:
+                    results["cases"][name] = {"skipped": str(exc)}
+                    self.stdout.write(f"{name:<28} skipped: {exc}")
+                    continue
+
+                results["cases"][name] = case
+                self.stdout.write(
+                    f"{name:<28} {case['status']:>4} p50 {case['p50_ms']:>8.2f} ms "
+                    f"p95 {case['p95_ms']:>8.2f} ms  {case['queries']:>3} queries"
+                )
+
+        with open(opts["output"], "w") as fh:
+            json.dump(results, fh, indent=2)
+        self.stdout.write(f"wrote {opts['output']}")
+
+        if opts["baseline"]:
+            with open(opts["baseline"]) as fh:
+                baseline = json.load(fh)
+            regressions = compare(results, baseline, tolerance=opts["tolerance"])
+            for name, message in regressions:
+                self.stdout.write(self.style.WARNING(f"REGRESSION {name}: {message}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("no regressions against baseline"))
+            elif opts["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regression(s) against the baseline")
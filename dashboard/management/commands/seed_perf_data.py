@@ -0,0 +1,167 @@
+# dashboard/management/commands/seed_perf_data.py
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Profile
+from dashboard.models import Goal, Note, Task
+from dashboard.views import DEFAULTS_VERSION
+from messaging.models import Message
+from projects.models import Project
+
+BATCH_SIZE = 1000
+PASSWORD = "perf-pass"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic synthetic users, tasks, goals, notes, "
+        "messages and projects for benchmarking (see run_benchmarks). "
+        f"Users are named <prefix>_<n>; the password is '{PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--tasks", type=int, default=30, help="Per user.")
+        parser.add_argument("--goals", type=int, default=20, help="Per user.")
+        parser.add_argument("--notes", type=int, default=500, help="Per user.")
+        parser.add_argument("--messages", type=int, default=200, help="Received per user.")
+        parser.add_argument("--projects", type=int, default=10, help="Owned per user.")
+        parser.add_argument("--stakeholders", type=int, default=3, help="Per project.")
+        parser.add_argument(
+            "--attachments", type=int, default=1,
+            help="Received messages per user that carry a small attachment.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="perf")
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete users from an earlier run with the same prefix first.",
+        )
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        prefix = opts["prefix"]
+        now = timezone.now()
+
+        with transaction.atomic():
+            if opts["clear"]:
+                deleted, _ = User.objects.filter(username__startswith=f"{prefix}_").delete()
+                self.stdout.write(f"cleared {deleted} row(s)")
+
+            # bulk_create skips the post_save profile signal; profiles are
+            # created below, already marked as seeded
+            password = make_password(PASSWORD)
+            users = User.objects.bulk_create([
+                User(
+                    username=f"{prefix}_{i}",
+                    email=f"{prefix}_{i}@example.com",
+                    password=password,
+                )
+                for i in range(opts["users"])
+            ], batch_size=BATCH_SIZE)
+            Profile.objects.bulk_create(
+                [Profile(user=u, defaults_version=DEFAULTS_VERSION) for u in users],
+                batch_size=BATCH_SIZE,
+            )
+
+            def ago(max_days):
+                return now - timedelta(seconds=rng.randint(0, max_days * 86400))
+
+            Task.objects.bulk_create([
+                Task(user=u, title=f"Task {n}", order=n, completed=rng.random() < 0.4)
+                for u in users for n in range(opts["tasks"])
+            ], batch_size=BATCH_SIZE)
+
+            goals = []
+            for u in users:
+                for n in range(opts["goals"]):
+                    progress = rng.random() < 0.5
+                    goals.append(Goal(
+                        user=u,
+                        title=f"Goal {n}",
+                        goal_type=Goal.GOAL_TYPE_PROGRESS if progress else Goal.GOAL_TYPE_STATIC,
+                        target_value=rng.randint(5, 100) if progress else None,
+                        current_value=rng.randint(0, 5),
+                        selected=rng.random() < 0.5,
+                        completed=rng.random() < 0.2,
+                        order=n,
+                    ))
+            Goal.objects.bulk_create(goals, batch_size=BATCH_SIZE)
+
+            Note.objects.bulk_create([
+                Note(
+                    user=u,
+                    text=f"Note {n}",
+                    completed=rng.random() < 0.7,
+                    created_at=ago(730),
+                )
+                for u in users for n in range(opts["notes"])
+            ], batch_size=BATCH_SIZE)
+
+            messages = []
+            for u in users:
+                others = [o for o in users if o.pk != u.pk] or [u]
+                for n in range(opts["messages"]):
+                    state = rng.random()
+                    messages.append(Message(
+                        sender=rng.choice(others),
+                        recipient=u,
+                        subject=f"Message {n}",
+                        body="Lorem ipsum dolor sit amet. " * rng.randint(1, 20),
+                        is_read=state < 0.7,
+                        archived=0.7 <= state < 0.8,
+                        deleted_by_recipient=0.8 <= state < 0.85,
+                        deleted_by_sender=rng.random() < 0.05,
+                        created_at=ago(365),
+                    ))
+            Message.objects.bulk_create(messages, batch_size=BATCH_SIZE)
+
+            # Attachments need real files, so these go through save()
+            for u in users:
+                for n in range(opts["attachments"]):
+                    msg = Message(
+                        sender=rng.choice(users), recipient=u,
+                        subject=f"Attachment {n}", body="See attached.",
+                    )
+                    msg.attachment.save(
+                        f"{prefix}-{u.pk}-{n}.txt",
+                        ContentFile(b"benchmark attachment\n" * 256),
+                        save=False,
+                    )
+                    msg.save()
+
+            projects = []
+            for u in users:
+                for n in range(opts["projects"]):
+                    start = date.today() - timedelta(days=rng.randint(0, 365))
+                    projects.append(Project(
+                        name=f"Project {u.pk}-{n}",
+                        description="Synthetic project",
+                        start_date=start,
+                        end_date=start + timedelta(days=rng.randint(7, 400)),
+                        owner=u,
+                        status=rng.choice([c for c, _ in Project.STATUS_CHOICES]),
+                    ))
+            projects = Project.objects.bulk_create(projects, batch_size=BATCH_SIZE)
+
+            Stakeholder = Project.stakeholders.through
+            Stakeholder.objects.bulk_create([
+                Stakeholder(project_id=p.pk, user_id=s.pk)
+                for p in projects
+                for s in rng.sample(users, min(opts["stakeholders"], len(users)))
+                if s.pk != p.owner_id
+            ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"seeded {len(users)} user(s) '{prefix}_0'..: "
+            f"{len(users) * opts['tasks']} tasks, {len(goals)} goals, "
+            f"{len(users) * opts['notes']} notes, {len(messages)} messages, "
+            f"{len(projects)} projects"
+        ))
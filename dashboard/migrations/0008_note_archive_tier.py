@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_tombstone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['user', 'completed', '-created_at', '-id'], name='note_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('archived', True)), fields=['user', '-created_at', '-id'], name='note_archive_idx'),
+        ),
+    ]
@@ -14,9 +14,14 @@ class Task(models.Model):
     completed = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["order", "created_at"]
+        indexes = [
+            # Covers the list API validator (max updated_at + count)
+            models.Index(fields=["user", "updated_at"], name="task_user_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -52,9 +57,13 @@ class Goal(models.Model):
 
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["order", "created_at"]
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="goal_user_updated_idx"),
+        ]
 
     def progress_percentage(self):
         """Return 0–100% progress for progress goals, or 100 if static + completed."""
@@ -83,7 +92,62 @@ class Note(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notes")
     text = models.CharField(max_length=255)
     completed = models.BooleanField(default=False)
+    # Archive tier: old completed notes, kept out of the hot set
+    archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="note_user_updated_idx"),
+            # Home window: open notes first, newest first, hot set only
+            models.Index(
+                fields=["user", "completed", "-created_at", "-id"],
+                name="note_hot_idx",
+                condition=models.Q(archived=False),
+            ),
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="note_archive_idx",
+                condition=models.Q(archived=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.text[:30]}..."
+
+
+# ============================================================
+# SYNC TOMBSTONES
+# ============================================================
+class Tombstone(models.Model):
+    """
+    Marker left behind when a task, goal or note is deleted, so the
+    delta-sync endpoint can tell clients to drop it. Pruned after
+    DASHBOARD_SYNC_TOMBSTONE_DAYS by ``prune_sync_tombstones``.
+    """
+
+    KIND_TASK = "task"
+    KIND_GOAL = "goal"
+    KIND_NOTE = "note"
+
+    KINDS = [
+        (KIND_TASK, "Task"),
+        (KIND_GOAL, "Goal"),
+        (KIND_NOTE, "Note"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tombstones")
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at", "id"], name="tombstone_user_sync_idx"),
+            models.Index(fields=["deleted_at"], name="tombstone_prune_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
@@ -0,0 +1,145 @@
+# dashboard/notes.py
+"""
+Paging and archiving for notes.
+
+The hot set (``archived=False``) is what the home page reads: open notes
+first, then completed ones, newest first, in keyset pages over
+``note_hot_idx``. Completed notes untouched for
+DASHBOARD_NOTES_ARCHIVE_DAYS are moved to the archive tier by the
+``archive_notes`` command; they stay reachable with ``?archived=1`` and
+leave the sync feed as tombstones.
+"""
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from productivityhub.pagination import MAX_PAGE_SIZE, decode_cursor, keyset_page
+from .caching import bump_generation
+from .models import Note, Tombstone
+
+
+def get_page_size(request):
+    default = getattr(settings, "DASHBOARD_NOTES_PAGE_SIZE", 20)
+    try:
+        size = int(request.GET.get("page_size", default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _encode_hot_cursor(note):
+    raw = f"{int(note.completed)}|{note.created_at.isoformat()}|{note.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_hot_cursor(token):
+    """Returns (completed, created_at, id), or None for a missing/malformed token."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        completed, created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return completed == "1", datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def clean_cursor(token, archived=False):
+    """``token`` if it is a valid cursor for the tier, else None (first page)."""
+    decode = decode_cursor if archived else _decode_hot_cursor
+    return token if decode(token) else None
+
+
+def notes_page(user, before=None, page_size=20, archived=False):
+    """
+    One page of ``user``'s notes after the ``before`` cursor.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    if archived:
+        return keyset_page(
+            Note.objects.filter(user=user, archived=True), before, page_size
+        )
+
+    qs = Note.objects.filter(user=user, archived=False).order_by(
+        "completed", "-created_at", "-id"
+    )
+
+    position = _decode_hot_cursor(before)
+    if position:
+        completed, created_at, pk = position
+        # Rest of the cursor's group (open/completed), then the later group
+        same_group = models.Q(completed=completed) & (
+            models.Q(created_at__lt=created_at)
+            | models.Q(created_at=created_at, id__lt=pk)
+        )
+        qs = qs.filter(same_group | models.Q(completed__gt=completed))
+
+    items = list(qs[: page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = _encode_hot_cursor(items[-1])
+
+    return items, next_cursor
+
+
+def archive_completed_notes(days=None, batch_size=500):
+    """
+    Move completed notes that have not changed for ``days`` (default
+    DASHBOARD_NOTES_ARCHIVE_DAYS) to the archive tier, ``batch_size`` rows
+    per transaction. Returns the number of notes archived.
+    """
+    if days is None:
+        days = getattr(settings, "DASHBOARD_NOTES_ARCHIVE_DAYS", 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                Note.objects.select_for_update(skip_locked=True)
+                .filter(archived=False, completed=True, updated_at__lt=cutoff)
+                .values_list("pk", "user_id")[:batch_size]
+            )
+            if not batch:
+                break
+
+            Note.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                archived=True, updated_at=now
+            )
+            # Archived notes leave the sync feed like deleted ones
+            Tombstone.objects.bulk_create([
+                Tombstone(user_id=user_id, kind=Tombstone.KIND_NOTE, object_id=pk)
+                for pk, user_id in batch
+            ])
+
+        # Only reaches workers sharing this cache; elsewhere the archive
+        # shows up once the memoised list validators expire
+        for user_id in {user_id for _, user_id in batch}:
+            bump_generation(user_id)
+        total += len(batch)
+
+    return total
+
+
+def restore_notes(user, pks):
+    """
+    Bring ``user``'s archived notes ``pks`` back to the hot set (a note
+    that is un-completed is active again). Their archive tombstones are
+    dropped so sync clients get the rows back as ordinary changes.
+    """
+    with transaction.atomic():
+        Note.objects.filter(user=user, pk__in=pks, archived=True).update(
+            archived=False, updated_at=timezone.now()
+        )
+        forget_tombstones(user, pks)
+
+
+def forget_tombstones(user, pks):
+    Tombstone.objects.filter(
+        user=user, kind=Tombstone.KIND_NOTE, object_id__in=pks
+    ).delete()
@@ -9,6 +9,16 @@ document.addEventListener("DOMContentLoaded", () => {
   }
   const csrftoken = getCookie("csrftoken");
 
+  // Don't leave synced notes behind on a shared browser
+  const logoutLink = document.getElementById("logoutLink");
+  if (logoutLink) {
+    logoutLink.addEventListener("click", () => {
+      Object.keys(localStorage)
+        .filter((key) => key.startsWith("dashboardSync:"))
+        .forEach((key) => localStorage.removeItem(key));
+    });
+  }
+
   // 1️⃣ TASK TOGGLE (HOME CARD)
   const taskList = document.getElementById("taskList");
 
@@ -45,11 +55,9 @@ document.addEventListener("DOMContentLoaded", () => {
         }
       }
 
-      // Persist to backend
-      fetch(`/api/tasks/toggle/${id}/`, {
-        method: "POST",
-        headers: { "X-CSRFToken": csrftoken },
-      })
+      // Persist to backend (batched with other quick clicks)
+      window.dashboardBatch
+        .queue({ op: "toggle", kind: "task", id: Number(id) })
         .then(() => {
           // 🔔 Tell main.js to update the weekly chart
           document.dispatchEvent(new CustomEvent("dashboardTasksChanged"));
@@ -64,7 +72,54 @@ document.addEventListener("DOMContentLoaded", () => {
   const addNoteBtn = document.getElementById("addNoteBtn");
 
   if (notesList && noteInput && addNoteBtn) {
-    function renderNotes(notes) {
+    const moreBtn = document.getElementById("notesMoreBtn");
+
+    // The notes card keeps a local copy of the hot set (open notes first),
+    // filled from /api/sync/ and kept in localStorage with its token, so a
+    // reload or a write only fetches what changed since. A bounded window
+    // of it is shown; "older" just widens the window.
+    const NOTES_WINDOW = 20;
+    const storageKey = `dashboardSync:${notesList.dataset.user}`;
+    let shown = NOTES_WINDOW;
+    let syncState = { since: null, notes: {} };
+
+    try {
+      syncState = JSON.parse(localStorage.getItem(storageKey)) || syncState;
+    } catch (err) {
+      localStorage.removeItem(storageKey);
+    }
+
+    function sortedNotes() {
+      return Object.values(syncState.notes).sort(
+        (a, b) =>
+          a.completed - b.completed ||
+          b.created_at.localeCompare(a.created_at) ||
+          b.id - a.id
+      );
+    }
+
+    function noteItem(n) {
+      const li = document.createElement("li");
+      li.className =
+        "list-group-item bg-transparent text-light border-secondary d-flex justify-content-between align-items-center";
+
+      li.innerHTML = `
+        <div class="d-flex align-items-center">
+          <input type="checkbox"
+                 class="form-check-input me-2 note-toggle"
+                 data-id="${n.id}"
+                 ${n.completed ? "checked" : ""}>
+          <span class="${n.completed ? "text-decoration-line-through text-muted" : ""}">
+            ${n.text}
+          </span>
+        </div>
+        <button class="btn btn-sm btn-danger note-delete" data-id="${n.id}">X</button>
+      `;
+      return li;
+    }
+
+    function renderNotes() {
+      const notes = sortedNotes();
       notesList.innerHTML = "";
 
       if (!notes.length) {
@@ -73,41 +128,56 @@ document.addEventListener("DOMContentLoaded", () => {
           "list-group-item bg-transparent text-muted text-center border-secondary";
         li.textContent = "No notes yet — add one above.";
         notesList.appendChild(li);
-        return;
       }
 
-      notes.forEach((n) => {
-        const li = document.createElement("li");
-        li.className =
-          "list-group-item bg-transparent text-light border-secondary d-flex justify-content-between align-items-center";
-
-        li.innerHTML = `
-          <div class="d-flex align-items-center">
-            <input type="checkbox"
-                   class="form-check-input me-2 note-toggle"
-                   data-id="${n.id}"
-                   ${n.completed ? "checked" : ""}>
-            <span class="${n.completed ? "text-decoration-line-through text-muted" : ""}">
-              ${n.text}
-            </span>
-          </div>
-          <button class="btn btn-sm btn-danger note-delete" data-id="${n.id}">X</button>
-        `;
+      notes.slice(0, shown).forEach((n) => notesList.appendChild(noteItem(n)));
 
-        notesList.appendChild(li);
-      });
+      if (moreBtn) moreBtn.classList.toggle("d-none", notes.length <= shown);
+    }
+
+    // Several queued toggles settle together; reload the notes once
+    let reloadTimer = null;
+    function scheduleNotesReload() {
+      clearTimeout(reloadTimer);
+      reloadTimer = setTimeout(loadNotes, 0);
     }
 
     async function loadNotes() {
       try {
-        const res = await fetch("/api/notes/list/");
-        const data = await res.json();
-        renderNotes(data.notes || []);
+        let more = true;
+        while (more) {
+          const query = syncState.since
+            ? `?since=${encodeURIComponent(syncState.since)}`
+            : "";
+          const res = await fetch(`/api/sync/${query}`);
+          const data = await res.json();
+
+          // The token could not be continued; start again from scratch
+          if (data.reset) syncState.notes = {};
+          (data.notes || []).forEach((n) => {
+            syncState.notes[n.id] = n;
+          });
+          (data.deleted || []).forEach((d) => {
+            if (d.kind === "note") delete syncState.notes[d.id];
+          });
+          syncState.since = data.since;
+          more = data.has_more;
+        }
+
+        localStorage.setItem(storageKey, JSON.stringify(syncState));
+        renderNotes();
       } catch (err) {
         console.error("Error loading notes:", err);
       }
     }
 
+    function loadMoreNotes() {
+      shown += NOTES_WINDOW;
+      renderNotes();
+    }
+
+    if (moreBtn) moreBtn.addEventListener("click", loadMoreNotes);
+
     addNoteBtn.addEventListener("click", async () => {
       const text = noteInput.value.trim();
       if (!text) return;
@@ -142,11 +212,8 @@ document.addEventListener("DOMContentLoaded", () => {
       if (toggle) {
         const id = toggle.dataset.id;
         try {
-          await fetch(`/api/notes/toggle/${id}/`, {
-            method: "POST",
-            headers: { "X-CSRFToken": csrftoken },
-          });
-          loadNotes();
+          await window.dashboardBatch.queue({ op: "toggle", kind: "note", id: Number(id) });
+          scheduleNotesReload();
         } catch (err) {
           console.error("Error toggling note:", err);
         }
@@ -167,6 +234,8 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     });
 
+    // Show the stored copy at once, then catch up
+    if (syncState.since) renderNotes();
     loadNotes();
   }
 });
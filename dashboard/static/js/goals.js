@@ -33,12 +33,20 @@ document.addEventListener("DOMContentLoaded", () => {
   let CUSTOM = [];
   let SAVED = [];
 
+  // Last validator from the server; unchanged lists come back as 304
+  let goalsEtag = null;
+
   // -----------------------------
   // Load from backend
   // -----------------------------
   async function loadGoals() {
     try {
-      const res = await fetch("/api/goals/data/");
+      const res = await fetch("/api/goals/data/", {
+        headers: goalsEtag ? { "If-None-Match": goalsEtag } : {},
+      });
+      if (res.status === 304) return;
+
+      goalsEtag = res.headers.get("ETag");
       const data = await res.json();
 
       POPULAR = data.popular || [];
@@ -53,6 +61,13 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Several queued toggles settle together; reload the lists once
+  let reloadTimer = null;
+  function scheduleReload() {
+    clearTimeout(reloadTimer);
+    reloadTimer = setTimeout(loadGoals, 0);
+  }
+
   // -----------------------------
   // Render Popular Goals (ALL)
   // -----------------------------
@@ -190,13 +205,14 @@ document.addEventListener("DOMContentLoaded", () => {
     const id = btn.dataset.id;
     if (!id) return;
 
-    try {
-      await fetch(`/api/goals/toggle/${id}/`, {
-        method: "POST",
-        headers: { "X-CSRFToken": csrftoken },
-      });
+    // Show the new state right away; the write is batched
+    const selected = !btn.classList.contains("btn-success");
+    btn.classList.toggle("btn-success", selected);
+    btn.classList.toggle("btn-outline-secondary", !selected);
 
-      await loadGoals();
+    try {
+      await window.dashboardBatch.queue({ op: "toggle", kind: "goal", id: Number(id) });
+      scheduleReload();
     } catch (err) {
       console.error("Error toggling goal selection:", err);
     }
@@ -252,13 +268,11 @@ document.addEventListener("DOMContentLoaded", () => {
     }
 
     try {
-      await fetch(`/api/goals/progress/${id}/`, {
-        method: "POST",
-        headers: {
-          "X-CSRFToken": csrftoken,
-          "Content-Type": "application/x-www-form-urlencoded",
-        },
-        body: new URLSearchParams({ progress }),
+      await window.dashboardBatch.queue({
+        op: "progress",
+        kind: "goal",
+        id: Number(id),
+        progress: Number(progress),
       });
 
       emitProgressUpdate();
@@ -275,16 +289,14 @@ document.addEventListener("DOMContentLoaded", () => {
     if (!check) return;
 
     const id = check.dataset.id;
-    const completed = check.checked ? "1" : "0";
+    const completed = check.checked;
 
     try {
-      await fetch(`/api/goals/progress/${id}/`, {
-        method: "POST",
-        headers: {
-          "X-CSRFToken": csrftoken,
-          "Content-Type": "application/x-www-form-urlencoded",
-        },
-        body: new URLSearchParams({ completed }),
+      await window.dashboardBatch.queue({
+        op: "progress",
+        kind: "goal",
+        id: Number(id),
+        completed,
       });
 
       emitProgressUpdate();
@@ -333,9 +345,9 @@ document.addEventListener("DOMContentLoaded", () => {
       row.addEventListener("dragend", async () => {
         row.classList.remove("dragging");
 
-        const ids = [...savedList.querySelectorAll(".draggable-goal")].map(
-          (el) => el.dataset.id
-        );
+        // Only send the moved goal and its new neighbours
+        const prev = row.previousElementSibling;
+        const next = row.nextElementSibling;
 
         try {
           await fetch("/api/goals/reorder/", {
@@ -344,7 +356,11 @@ document.addEventListener("DOMContentLoaded", () => {
               "X-CSRFToken": csrftoken,
               "Content-Type": "application/x-www-form-urlencoded",
             },
-            body: new URLSearchParams(ids.map((id) => ["order[]", id])),
+            body: new URLSearchParams({
+              moved: row.dataset.id,
+              after: prev && prev.dataset.id ? prev.dataset.id : "",
+              before: next && next.dataset.id ? next.dataset.id : "",
+            }),
           });
         } catch (err) {
           console.error("Error reordering goals:", err);
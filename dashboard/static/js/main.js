@@ -1,5 +1,80 @@
 // static/js/main.js
 
+// ----------------------------
+// Batched dashboard writes
+// ----------------------------
+// Checkbox clicks, toggles and slider moves are queued and sent together
+// to /api/batch/ shortly after the last one, so ticking many items costs
+// one request. queue(op) resolves with that operation's result.
+window.dashboardBatch = (() => {
+  const FLUSH_DELAY_MS = 300;
+  let pending = [];
+  let timer = null;
+
+  function csrfToken() {
+    const match = document.cookie.match(/(?:^|; )csrftoken=([^;]*)/);
+    return match ? match[1] : "";
+  }
+
+  function send(entries, keepalive) {
+    return fetch("/api/batch/", {
+      method: "POST",
+      keepalive,
+      headers: {
+        "X-CSRFToken": csrfToken(),
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ ops: entries.map((e) => e.op) }),
+    });
+  }
+
+  async function flush() {
+    clearTimeout(timer);
+    timer = null;
+    const entries = pending;
+    pending = [];
+    if (!entries.length) return;
+
+    try {
+      const res = await send(entries, false);
+      if (!res.ok) throw new Error(`batch failed: ${res.status}`);
+      const data = await res.json();
+      entries.forEach((e, i) => e.resolvers.forEach((r) => r.resolve(data.results[i])));
+    } catch (err) {
+      entries.forEach((e) => e.resolvers.forEach((r) => r.reject(err)));
+    }
+  }
+
+  function queue(op) {
+    return new Promise((resolve, reject) => {
+      // A newer progress value for the same goal replaces the queued one
+      const same =
+        op.op === "progress" &&
+        pending.find((e) => e.op.op === "progress" && e.op.kind === op.kind && e.op.id === op.id);
+
+      if (same) {
+        same.op = op;
+        same.resolvers.push({ resolve, reject });
+      } else {
+        pending.push({ op, resolvers: [{ resolve, reject }] });
+      }
+
+      clearTimeout(timer);
+      timer = setTimeout(flush, FLUSH_DELAY_MS);
+    });
+  }
+
+  // Don't lose queued clicks when the user navigates away
+  window.addEventListener("pagehide", () => {
+    if (!pending.length) return;
+    clearTimeout(timer);
+    send(pending, true);
+    pending = [];
+  });
+
+  return { queue, flush };
+})();
+
 document.addEventListener("DOMContentLoaded", () => {
   const body = document.body;
   const toggleBtn = document.getElementById("themeToggle");
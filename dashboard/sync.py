@@ -0,0 +1,121 @@
+# dashboard/sync.py
+"""
+Delta sync for tasks, goals and notes.
+
+A ``since`` token bundles one keyset cursor per model (the same
+(updated_at, id) cursors as messaging's sync feed), one for tombstones
+and the time it was issued. Every model is paged separately, so a
+response holds at most ``page_size`` rows of each kind however much
+history the user has.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from productivityhub.pagination import MAX_PAGE_SIZE, changes_since, decode_cursor, encode_cursor
+from .models import Goal, Note, Task, Tombstone
+
+SYNC_MODELS = {
+    "tasks": Task,
+    "goals": Goal,
+    "notes": Note,
+}
+
+# Rows outside these filters are not synced (archived notes leave the
+# feed through tombstones, see dashboard.notes)
+SYNC_FILTERS = {
+    "notes": {"archived": False},
+}
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "DASHBOARD_SYNC_TOMBSTONE_DAYS", 30))
+
+
+def get_page_size(request):
+    default = getattr(settings, "DASHBOARD_SYNC_PAGE_SIZE", 200)
+    try:
+        size = int(request.GET.get("page_size", default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def record_deletions(user, kind, ids):
+    """Leave a tombstone for each deleted ``kind`` row; one INSERT."""
+    Tombstone.objects.bulk_create(
+        [Tombstone(user=user, kind=kind, object_id=pk) for pk in ids]
+    )
+
+
+def _encode_token(cursors, issued_at):
+    raw = json.dumps({"at": issued_at.isoformat(), "cursors": cursors})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_token(token):
+    """
+    Returns (cursors, issued_at), or None for a malformed token: anything
+    but an aware ``at`` and a dict of valid cursors (or nulls).
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded).decode())
+        cursors, issued_at = data["cursors"], datetime.fromisoformat(data["at"])
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+
+    if timezone.is_naive(issued_at) or not isinstance(cursors, dict):
+        return None
+    for name in (*SYNC_MODELS, "deleted"):
+        cursor = cursors.get(name)
+        if cursor is not None and decode_cursor(cursor) is None:
+            return None
+    return {name: cursors.get(name) for name in (*SYNC_MODELS, "deleted")}, issued_at
+
+
+def _initial_cursors(user):
+    """Cursors for a full sync: every row, and only deletions from now on."""
+    cursors = {name: None for name in SYNC_MODELS}
+    last = Tombstone.objects.filter(user=user).order_by("-deleted_at", "-id").first()
+    cursors["deleted"] = encode_cursor(last, "deleted_at") if last else None
+    return cursors
+
+
+def sync_changes(user, since=None, page_size=200):
+    """
+    Rows of each model changed after ``since``, plus tombstones.
+
+    A token that is malformed or older than the tombstone retention
+    cannot be continued safely; the sync then starts over and ``reset``
+    tells the client to drop its local copy first.
+    """
+    now = timezone.now()
+    state = _decode_token(since) if since else None
+    reset = bool(since) and (state is None or state[1] < now - tombstone_retention())
+
+    cursors = state[0] if state and not reset else _initial_cursors(user)
+
+    result = {"reset": reset, "has_more": False}
+    for name, model in SYNC_MODELS.items():
+        items, cursors[name], more = changes_since(
+            model.objects.filter(user=user, **SYNC_FILTERS.get(name, {})),
+            cursors.get(name),
+            page_size,
+        )
+        result[name] = items
+        result["has_more"] |= more
+
+    result["deleted"], cursors["deleted"], more = changes_since(
+        Tombstone.objects.filter(user=user),
+        cursors.get("deleted"),
+        page_size,
+        field="deleted_at",
+    )
+    result["has_more"] |= more
+
+    result["since"] = _encode_token(cursors, now)
+    return result
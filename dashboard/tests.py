@@ -1,3 +1,612 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from productivityhub.db import flip_boolean
+from productivityhub.pagination import encode_position
+from productivityhub.perf import prune_worker_logs
+from productivityhub.testing import Fixtures, QueryBudgetMixin
+
+from .batch import apply_batch, parse_operations
+from .caching import _validator_key, get_generation
+from .models import Goal, Note, Task, Tombstone
+from .notes import archive_completed_notes
+from . import views
+from .views import DEFAULTS_VERSION
+
+
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Query budgets for the dashboard pages and API, measured with a cold
+    cache. Warm list GETs make no queries at all (see ListCacheTests).
+    """
+
+    # Every request starts with the session and user lookups (2). Pages
+    # add the navbar's avatar key and unread count (2). Writes that touch
+    # several statements run in a transaction, whose SAVEPOINT and RELEASE
+    # are counted too (2).
+    BUDGETS = {
+        # 2 + goals + tasks + navbar
+        "home": 6,
+        # 2 + navbar; the lists load from the JSON API
+        "goals": 4,
+        "tasks": 4,
+        # 2 + validator aggregate + rows
+        "goals_data": 4,
+        # 2 + UPDATE ... RETURNING
+        "goal_toggle": 3,
+        # 2 + clear selection + set selection
+        "goals_save_selection": 4,
+        # 2 + read goal + UPDATE
+        "goal_update_progress": 4,
+        # 2 + max(order) + INSERT
+        "goal_create": 4,
+        # 2 + read + transaction(tombstone INSERT + DELETE)
+        "goal_delete": 7,
+        # 2 + transaction(read orders + one CASE UPDATE)
+        "goal_reorder": 6,
+        # 2 + transaction(read neighbours + shift rows below + place moved)
+        "goal_reorder:sparse": 7,
+        # 2 + validator aggregate + rows
+        "tasks_list": 4,
+        # 2 + transaction(read + DELETE + tombstones + CASE UPDATE)
+        "tasks_save_selection": 8,
+        # 2 + UPDATE ... RETURNING
+        "task_toggle": 3,
+        # 2 + read + transaction(tombstone INSERT + DELETE)
+        "task_delete": 7,
+        # 2 + validator aggregate + page
+        "notes_list": 4,
+        # 2 + INSERT
+        "note_create": 3,
+        # 2 + UPDATE ... RETURNING
+        "note_toggle": 3,
+        # 2 + read + transaction(tombstone INSERT + DELETE)
+        "note_delete": 7,
+        # 2 + transaction(lock tasks + one bulk UPDATE), whatever the op count
+        "dashboard_batch": 6,
+        # 2 + transaction(lock tasks, goals, notes + max(order) + UPDATE
+        # tasks + INSERT task + UPDATE goals + DELETE notes + tombstones)
+        "dashboard_batch:mixed": 13,
+        # 2 + last tombstone (initial cursor) + tasks, goals, notes, tombstones
+        "dashboard_sync": 7,
+        # 2 + tasks, goals, notes, tombstones since the token
+        "dashboard_sync:delta": 6,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        Profile.objects.filter(user=self.user).update(defaults_version=DEFAULTS_VERSION)
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["defaults_version"] = DEFAULTS_VERSION
+        session.save()
+
+    def grow(self, size):
+        """Bring the user up to ``size`` tasks, goals and notes."""
+        have = self.user.tasks.count()
+        Task.objects.bulk_create([
+            Task(user=self.user, title=f"Task {n}", order=n) for n in range(have, size)
+        ])
+        Goal.objects.bulk_create([
+            Goal(user=self.user, title=f"Goal {n}", order=n, selected=n % 2 == 0)
+            for n in range(have, size)
+        ])
+        Note.objects.bulk_create([
+            Note(user=self.user, text=f"Note {n}", completed=n % 3 == 0)
+            for n in range(have, size)
+        ])
+        self.fixtures = Fixtures.for_user(self.user)
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets(self.BUDGETS, self.grow, sizes=(2, 25))
+
+
+class GoalReorderTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("bob", password="pw")
+        self.client.force_login(self.user)
+
+    def make_goals(self, orders):
+        return [
+            Goal.objects.create(user=self.user, title=f"Goal {n}", order=order, selected=True)
+            for n, order in enumerate(orders)
+        ]
+
+    def saved_titles(self):
+        return list(
+            Goal.objects.filter(user=self.user, selected=True)
+            .order_by("order", "created_at", "pk")
+            .values_list("title", flat=True)
+        )
+
+    def reorder(self, **data):
+        return self.client.post(reverse("goal_reorder"), data)
+
+    def test_full_list_writes_only_moved_rows(self):
+        a, b, c = self.make_goals([0, 1, 2])
+
+        response = self.reorder(**{"order[]": [c.pk, a.pk, b.pk]})
+
+        self.assertEqual(response.json(), {"ok": True, "updated": 3})
+        self.assertEqual(self.saved_titles(), ["Goal 2", "Goal 0", "Goal 1"])
+
+        response = self.reorder(**{"order[]": [c.pk, a.pk, b.pk]})
+        self.assertEqual(response.json()["updated"], 0)
+
+    def test_sparse_move_takes_a_free_slot(self):
+        a, b, c = self.make_goals([0, 5, 10])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.reorder(moved=a.pk, after=b.pk, before=c.pk)
+
+        # One read of the three rows, one single-row UPDATE
+        goal_sql = [q["sql"] for q in ctx.captured_queries if "dashboard_goal" in q["sql"]]
+        self.assertEqual(len(goal_sql), 2)
+        self.assertTrue(goal_sql[1].startswith("UPDATE"))
+
+        self.assertEqual(self.saved_titles(), ["Goal 1", "Goal 0", "Goal 2"])
+
+    def test_sparse_move_shifts_rows_below(self):
+        a, b, c = self.make_goals([0, 1, 2])
+
+        self.reorder(moved=c.pk, after=a.pk, before=b.pk)
+
+        self.assertEqual(self.saved_titles(), ["Goal 0", "Goal 2", "Goal 1"])
+
+        self.reorder(moved=b.pk, before=a.pk)
+        self.assertEqual(self.saved_titles(), ["Goal 1", "Goal 0", "Goal 2"])
+
+    def test_sparse_move_between_tied_neighbours_renumbers(self):
+        x, y, z = self.make_goals([0, 1, 1])
+
+        response = self.reorder(moved=x.pk, after=y.pk, before=z.pk)
+
+        self.assertTrue(response.json()["ok"])
+        self.assertEqual(self.saved_titles(), ["Goal 1", "Goal 0", "Goal 2"])
+        self.assertEqual(
+            list(Goal.objects.order_by("order").values_list("order", flat=True)),
+            [0, 1, 2],
+        )
+
+    def test_sparse_move_rejects_other_users_goals(self):
+        (mine,) = self.make_goals([0])
+        other = Goal.objects.create(
+            user=User.objects.create_user("eve"), title="Theirs", order=0
+        )
+
+        response = self.reorder(moved=mine.pk, after=other.pk)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class SyncTokenTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("carol", password="pw")
+        self.client.force_login(self.user)
+        Task.objects.create(user=self.user, title="Task")
+
+    def sync(self, since=None):
+        response = self.client.get(reverse("dashboard_sync"), {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def token(self, data):
+        raw = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def test_round_trip(self):
+        first = self.sync()
+        self.assertEqual(len(first["tasks"]), 1)
+
+        second = self.sync(first["since"])
+        self.assertFalse(second["reset"])
+
+    def test_tampered_tokens_reset_instead_of_failing(self):
+        now = timezone.now()
+        probes = {
+            "garbage": "not-a-token",
+            "naive at": self.token({"at": now.replace(tzinfo=None).isoformat(), "cursors": {}}),
+            "cursor not a string": self.token({"at": now.isoformat(), "cursors": {"tasks": 5}}),
+            "cursors not a dict": self.token({"at": now.isoformat(), "cursors": []}),
+            "bad cursor": self.token({"at": now.isoformat(), "cursors": {"tasks": "!!"}}),
+            "naive cursor": self.token({
+                "at": now.isoformat(),
+                "cursors": {"tasks": encode_position(now.replace(tzinfo=None), 1)},
+            }),
+        }
+        for label, since in probes.items():
+            with self.subTest(label):
+                data = self.sync(since)
+                self.assertTrue(data["reset"])
+                self.assertEqual(len(data["tasks"]), 1)
+
+
+class BatchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("dave", password="pw")
+        self.client.force_login(self.user)
+        self.tasks = [
+            Task.objects.create(user=self.user, title=f"Task {n}", order=n) for n in range(3)
+        ]
+
+    def batch(self, *ops):
+        return self.client.post(
+            reverse("dashboard_batch"), json.dumps({"ops": list(ops)}),
+            content_type="application/json",
+        )
+
+    def toggle(self, obj, kind="task"):
+        return {"op": "toggle", "kind": kind, "id": obj.pk}
+
+    def test_toggle_twice_cancels_out(self):
+        task = self.tasks[0]
+
+        results = self.batch(self.toggle(task), self.toggle(task)).json()["results"]
+
+        self.assertEqual([r["completed"] for r in results], [True, False])
+        task.refresh_from_db()
+        self.assertFalse(task.completed)
+
+    def test_operations_after_a_delete_report_not_found(self):
+        task = self.tasks[0]
+
+        results = self.batch(
+            {"op": "delete", "kind": "task", "id": task.pk}, self.toggle(task),
+        ).json()["results"]
+
+        self.assertEqual(results[0]["status"], "ok")
+        self.assertEqual(results[1], {"status": "not_found", "id": task.pk})
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    def test_mixed_creates_and_deletes(self):
+        note = Note.objects.create(user=self.user, text="Old note")
+
+        results = self.batch(
+            {"op": "create", "kind": "task", "title": "New task", "ref": "a"},
+            {"op": "delete", "kind": "task", "id": self.tasks[1].pk},
+            {"op": "create", "kind": "note", "text": "New note", "ref": "b"},
+            {"op": "delete", "kind": "note", "id": note.pk},
+            {"op": "create", "kind": "task", "title": "Another task", "ref": "c"},
+        ).json()["results"]
+
+        by_ref = {r["ref"]: r["id"] for r in results if r.get("ref")}
+        self.assertEqual(Task.objects.get(pk=by_ref["a"]).title, "New task")
+        self.assertEqual(Task.objects.get(pk=by_ref["c"]).title, "Another task")
+        self.assertEqual(Note.objects.get(pk=by_ref["b"]).text, "New note")
+        self.assertEqual(
+            set(Tombstone.objects.values_list("kind", "object_id")),
+            {("task", self.tasks[1].pk), ("note", note.pk)},
+        )
+
+    def test_bad_operation_rolls_back_the_whole_batch(self):
+        goal = Goal.objects.create(
+            user=self.user, title="Run", goal_type=Goal.GOAL_TYPE_PROGRESS, selected=True
+        )
+
+        response = self.batch(
+            self.toggle(self.tasks[0]),
+            {"op": "progress", "kind": "goal", "id": goal.pk, "progress": "lots"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.tasks[0].refresh_from_db()
+        self.assertFalse(self.tasks[0].completed)
+
+    def test_other_users_rows_are_not_found(self):
+        theirs = Task.objects.create(user=User.objects.create_user("eve"), title="Theirs")
+
+        results = self.batch(
+            self.toggle(theirs), {"op": "delete", "kind": "task", "id": theirs.pk},
+        ).json()["results"]
+
+        self.assertEqual([r["status"] for r in results], ["not_found", "not_found"])
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.completed)
+
+    def test_statement_count_does_not_grow_with_the_batch(self):
+        notes = [Note.objects.create(user=self.user, text=f"Note {n}") for n in range(30)]
+        tasks = self.tasks + [
+            Task.objects.create(user=self.user, title=f"Task {n}", order=n) for n in range(3, 30)
+        ]
+
+        def ops(start, stop):
+            return parse_operations([
+                *(self.toggle(t) for t in tasks[start:stop]),
+                *({"op": "delete", "kind": "note", "id": n.pk} for n in notes[start:stop]),
+                *({"op": "create", "kind": "task", "title": f"New {n}"} for n in range(start, stop)),
+            ])
+
+        # savepoint, lock tasks, lock notes, max(order), UPDATE tasks,
+        # DELETE notes, INSERT tasks, INSERT tombstones, release
+        with self.assertNumQueries(9):
+            apply_batch(self.user, ops(0, 3))
+        with self.assertNumQueries(9):
+            _, written = apply_batch(self.user, ops(3, 30))
+
+        self.assertEqual(written, {"updated": 27, "deleted": 27, "created": 27})
+
+
+class ToggleTests(TestCase):
+    """Each toggle flips its flag with a single UPDATE and no read first."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("erin", password="pw")
+        self.client.force_login(self.user)
+
+    def assert_flips(self, url_name, obj, field):
+        table = obj._meta.db_table
+        for expected in (True, False):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(reverse(url_name, args=[obj.pk]))
+
+            self.assertEqual(response.json()[field], expected)
+            obj.refresh_from_db()
+            self.assertEqual(getattr(obj, field), expected)
+
+            statements = [q["sql"] for q in ctx.captured_queries if table in q["sql"]]
+            self.assertEqual(len(statements), 1, statements)
+            self.assertTrue(statements[0].startswith("UPDATE"))
+
+    def test_goal_toggle(self):
+        goal = Goal.objects.create(user=self.user, title="Goal")
+        self.assert_flips("goal_toggle", goal, "selected")
+
+    def test_task_toggle(self):
+        task = Task.objects.create(user=self.user, title="Task")
+        self.assert_flips("task_toggle", task, "completed")
+
+    def test_note_toggle(self):
+        note = Note.objects.create(user=self.user, text="Note")
+        self.assert_flips("note_toggle", note, "completed")
+
+    def test_other_users_rows_are_404(self):
+        task = Task.objects.create(user=User.objects.create_user("eve"), title="Theirs")
+
+        response = self.client.post(reverse("task_toggle", args=[task.pk]))
+
+        self.assertEqual(response.status_code, 404)
+        task.refresh_from_db()
+        self.assertFalse(task.completed)
+
+    def test_fallback_without_update_returning(self):
+        task = Task.objects.create(user=self.user, title="Task")
+
+        with mock.patch("productivityhub.db.supports_update_returning", return_value=False):
+            self.assertEqual(flip_boolean(Task, "completed", pk=task.pk, user=self.user),
+                             {"completed": True})
+            self.assertIsNone(flip_boolean(Task, "completed", pk=task.pk, user_id=0))
+
+        task.refresh_from_db()
+        self.assertTrue(task.completed)
+
+
+class NoteArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("fay", password="pw")
+        self.client.force_login(self.user)
+        self.note = Note.objects.create(user=self.user, text="Old", completed=True)
+        Note.objects.filter(pk=self.note.pk).update(
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+
+    def test_archiving_elsewhere_changes_the_list_etag(self):
+        url = reverse("notes_list")
+        etag = self.client.get(url)["ETag"]
+
+        # The cron service cannot bump this cache's generation
+        with mock.patch("dashboard.notes.bump_generation"):
+            self.assertEqual(archive_completed_notes(days=30), 1)
+
+        # Trusted until the memoised validator times out
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        name = f"notes-hot-{settings.DASHBOARD_NOTES_PAGE_SIZE}-first"
+        cache.delete(_validator_key(name, self.user.pk, get_generation(self.user.pk)))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["notes"], [])
+
+    def assert_restored(self):
+        self.note.refresh_from_db()
+        self.assertFalse(self.note.completed)
+        self.assertFalse(self.note.archived)
+        self.assertFalse(Tombstone.objects.filter(object_id=self.note.pk).exists())
+
+    def test_uncompleting_an_archived_note_restores_it(self):
+        archive_completed_notes(days=30)
+
+        response = self.client.post(reverse("note_toggle", args=[self.note.pk]))
+
+        self.assertEqual(response.json(), {"ok": True, "completed": False, "archived": False})
+        self.assert_restored()
+
+    def test_batch_uncomplete_restores_archived_note(self):
+        archive_completed_notes(days=30)
+
+        results, _ = apply_batch(
+            self.user, [{"op": "toggle", "kind": Tombstone.KIND_NOTE, "id": self.note.pk}]
+        )
+
+        self.assertEqual(results[0]["archived"], False)
+        self.assert_restored()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    AUTHENTICATION_BACKENDS=[
+        "accounts.backends.CachedModelBackend",
+        "django.contrib.auth.backends.ModelBackend",
+    ],
+)
+class ListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("gus", password="pw")
+        self.client.login(username="gus", password="pw")
+        Task.objects.create(user=self.user, title="Task")
+
+    def test_warm_requests_skip_the_database(self):
+        url = reverse("tasks_list")
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()["tasks"][0]["title"], "Task")
+
+    def test_writes_replace_the_validator(self):
+        url = reverse("tasks_list")
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(reverse("tasks_save_selection"), {"titles[]": ["Other"]})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["title"] for t in response.json()["tasks"]], ["Other"])
+
+
+class TaskSelectionTests(TestCase):
+    """tasks_save_selection diffs the posted titles against the saved tasks."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("gus", password="pw")
+        self.client.force_login(self.user)
+        for order, title in enumerate(["Keep", "Move", "Drop"]):
+            Task.objects.create(user=self.user, title=title, order=order)
+        self.other = User.objects.create_user("hal")
+        self.theirs = Task.objects.create(user=self.other, title="Drop", order=0)
+
+    def save(self, titles):
+        response = self.client.post(reverse("tasks_save_selection"), {"titles[]": titles})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["written"]
+
+    def saved(self):
+        return list(self.user.tasks.order_by("order").values_list("title", "order"))
+
+    def test_adds_removes_and_reorders(self):
+        keep = Task.objects.get(user=self.user, title="Keep")
+
+        written = self.save(["Keep", "New", "Move", " New ", ""])
+
+        self.assertEqual(written, {"deleted": 1, "created": 1, "updated": 1})
+        self.assertEqual(self.saved(), [("Keep", 0), ("New", 1), ("Move", 2)])
+        # Unchanged rows are neither rewritten nor recreated
+        self.assertEqual(Task.objects.get(pk=keep.pk).updated_at, keep.updated_at)
+        self.assertTrue(
+            Tombstone.objects.filter(user=self.user, kind=Tombstone.KIND_TASK).exists()
+        )
+
+    def test_same_selection_writes_nothing(self):
+        written = self.save(["Keep", "Move", "Drop"])
+
+        self.assertEqual(written, {"deleted": 0, "created": 0, "updated": 0})
+        self.assertEqual(self.saved(), [("Keep", 0), ("Move", 1), ("Drop", 2)])
+
+    def test_other_users_tasks_are_untouched(self):
+        self.save([])
+
+        self.assertEqual(self.saved(), [])
+        self.assertTrue(Task.objects.filter(pk=self.theirs.pk).exists())
+        self.assertFalse(Tombstone.objects.filter(user=self.other).exists())
+
+
+class DefaultsSeedingTests(TestCase):
+    """ensure_user_defaults seeds once per DEFAULTS_VERSION."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("ida", password="pw")
+        self.client.force_login(self.user)
+
+    def counts(self):
+        return self.user.goals.count(), self.user.tasks.count()
+
+    def new_session(self):
+        self.client.logout()
+        self.client.force_login(self.user)
+
+    def test_first_visit_seeds_and_records_the_version(self):
+        self.client.get(reverse("home"))
+
+        self.assertEqual(self.counts(), (len(views.POPULAR_GOALS), len(views.POPULAR_TASKS)))
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.defaults_version, DEFAULTS_VERSION)
+
+    def test_new_session_skips_the_seed(self):
+        self.client.get(reverse("home"))
+        self.user.tasks.all().delete()
+        self.new_session()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("home"))
+
+        self.assertEqual(self.counts(), (len(views.POPULAR_GOALS), 0))
+        inserts = [q["sql"] for q in ctx.captured_queries if 'INSERT INTO "dashboard_' in q["sql"]]
+        self.assertEqual(inserts, [])
+
+    def test_new_version_adds_only_missing_defaults(self):
+        self.client.get(reverse("home"))
+        extra = {"title": "Stretch", "goal_type": "static"}
+
+        with mock.patch.object(views, "DEFAULTS_VERSION", DEFAULTS_VERSION + 1), \
+                mock.patch.object(views, "POPULAR_GOALS", [*views.POPULAR_GOALS, extra]):
+            self.new_session()
+            self.client.get(reverse("home"))
+            self.new_session()
+            self.client.get(reverse("home"))
+
+        self.assertEqual(self.counts(), (len(views.POPULAR_GOALS) + 1, len(views.POPULAR_TASKS)))
+        self.assertEqual(self.user.goals.filter(title="Stretch").count(), 1)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.defaults_version, DEFAULTS_VERSION + 1)
+
+
+class PerfLogPruneTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "perf.log")
+        # A pid that has certainly exited
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        child.wait()
+        self.dead = child.pid
+
+    def touch(self, suffix, age_hours):
+        name = f"{self.path}.{suffix}"
+        open(name, "w").close()
+        stamp = time.time() - age_hours * 3600
+        os.utime(name, (stamp, stamp))
+        return name
+
+    def test_only_quiet_logs_of_exited_workers_are_deleted(self):
+        mine = self.touch(os.getpid(), age_hours=48)
+        stale = [self.touch(self.dead, age_hours=48), self.touch(f"{self.dead}.1", age_hours=48)]
+        recent = self.touch(f"{self.dead + 1}", age_hours=0)
+
+        with override_settings(PERF_LOG_PATH=self.path, PERF_LOG_KEEP_HOURS=24):
+            self.assertEqual(prune_worker_logs(), 2)
+
+        self.assertTrue(os.path.exists(mine))
+        self.assertFalse(any(os.path.exists(name) for name in stale))
+        self.assertTrue(os.path.exists(recent))
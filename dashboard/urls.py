@@ -29,4 +29,10 @@ urlpatterns = [
     path("api/notes/create/", views.note_create, name="note_create"),
     path("api/notes/toggle/<int:pk>/", views.note_toggle, name="note_toggle"),
     path("api/notes/delete/<int:pk>/", views.note_delete, name="note_delete"),
+
+    # Batched mutations
+    path("api/batch/", views.api_batch, name="dashboard_batch"),
+
+    # Delta sync
+    path("api/sync/", views.api_sync, name="dashboard_sync"),
 ]
@@ -1,18 +1,30 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import Http404, JsonResponse, HttpResponseBadRequest
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST, require_GET
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 import json
 
-from .models import Task, Goal, Note
+from accounts.models import Profile
+from productivityhub.db import flip_boolean
+from .batch import apply_batch, apply_progress, parse_operations
+from .caching import bump_generation, cached_json_response, invalidates_dashboard_cache
+from .models import Task, Goal, Note, Tombstone
+from .notes import (
+    clean_cursor, get_page_size as get_notes_page_size, notes_page, restore_notes,
+)
+from .sync import get_page_size, record_deletions, sync_changes
 
 
 # ---------------------------------------------------------
 # Default lists (used at first login only – seeding)
 # ---------------------------------------------------------
 
+# Bump whenever POPULAR_GOALS / POPULAR_TASKS change so existing users
+# pick up the new entries on their next visit.
+DEFAULTS_VERSION = 1
+
 POPULAR_GOALS = [
     {"title": "Drink 8 glasses of water", "goal_type": "progress", "target_value": 8},
     {"title": "Read 20 pages", "goal_type": "progress", "target_value": 20},
@@ -48,30 +60,32 @@ POPULAR_TASKS = [
 # Seeding defaults (only on PAGE views)
 # ---------------------------------------------------------
 
+def _popular_goal(user, g, order):
+    return Goal(
+        user=user,
+        title=g["title"],
+        goal_type=g.get("goal_type", "static"),
+        target_value=g.get("target_value"),
+        current_value=0,
+        order=order,
+        selected=False,
+    )
+
+
 def seed_user_defaults(user):
     """
     Creates initial records ONLY if user has none.
     """
     if not user.goals.exists():
-        for i, g in enumerate(POPULAR_GOALS):
-            Goal.objects.create(
-                user=user,
-                title=g["title"],
-                goal_type=g.get("goal_type", "static"),
-                target_value=g.get("target_value"),
-                current_value=0,
-                order=i,
-                selected=False,
-            )
+        Goal.objects.bulk_create(
+            [_popular_goal(user, g, i) for i, g in enumerate(POPULAR_GOALS)]
+        )
 
     if not user.tasks.exists():
-        for i, t in enumerate(POPULAR_TASKS):
-            Task.objects.create(
-                user=user,
-                title=t,
-                order=i,
-                completed=False,
-            )
+        Task.objects.bulk_create([
+            Task(user=user, title=t, order=i, completed=False)
+            for i, t in enumerate(POPULAR_TASKS)
+        ])
 
 
 # ---------------------------------------------------------
@@ -89,16 +103,35 @@ def sync_popular_goals(user):
     if new_goals:
         max_order = user.goals.aggregate(models.Max("order"))["order__max"] or 0
 
-        for i, g in enumerate(new_goals, start=max_order + 1):
-            Goal.objects.create(
-                user=user,
-                title=g["title"],
-                goal_type=g.get("goal_type", "static"),
-                target_value=g.get("target_value"),
-                current_value=0,
-                order=i,
-                selected=False,
+        Goal.objects.bulk_create([
+            _popular_goal(user, g, i)
+            for i, g in enumerate(new_goals, start=max_order + 1)
+        ])
+
+
+def ensure_user_defaults(request):
+    """
+    One-time onboarding: seed/sync the default goals and tasks the first
+    time a user sees the dashboard, and again only when DEFAULTS_VERSION
+    is bumped. The seeded version lives on the profile; the session keeps
+    a copy so regular page views run no queries at all.
+    """
+    if request.session.get("defaults_version") == DEFAULTS_VERSION:
+        return
+
+    user = request.user
+    profile, _ = Profile.objects.get_or_create(user=user)
+
+    if profile.defaults_version < DEFAULTS_VERSION:
+        with transaction.atomic():
+            seed_user_defaults(user)
+            sync_popular_goals(user)
+            Profile.objects.filter(pk=profile.pk).update(
+                defaults_version=DEFAULTS_VERSION
             )
+        bump_generation(user.pk)
+
+    request.session["defaults_version"] = DEFAULTS_VERSION
 
 
 # ---------------------------------------------------------
@@ -107,7 +140,7 @@ def sync_popular_goals(user):
 
 @login_required
 def home(request):
-    seed_user_defaults(request.user)
+    ensure_user_defaults(request)
 
     top_goals_qs = request.user.goals.filter(selected=True).order_by("order")[:5]
     top_goals = [
@@ -137,14 +170,13 @@ def home(request):
 
 @login_required
 def goals(request):
-    seed_user_defaults(request.user)
-    sync_popular_goals(request.user)  # <-- FIX: sync new default goals
+    ensure_user_defaults(request)
     return render(request, "dashboard/goals.html")
 
 
 @login_required
 def tasks(request):
-    seed_user_defaults(request.user)
+    ensure_user_defaults(request)
     return render(request, "dashboard/tasks.html")
 
 
@@ -183,6 +215,7 @@ def _note_to_dict(n: Note):
         "id": n.id,
         "text": n.text,
         "completed": getattr(n, "completed", False),
+        "archived": n.archived,
         "created_at": n.created_at.isoformat(),
     }
 
@@ -191,10 +224,7 @@ def _note_to_dict(n: Note):
 # GOALS API
 # ---------------------------------------------------------
 
-@login_required
-@require_GET
-def goals_data(request):
-    user = request.user
+def _goals_payload(user):
     user_goals = user.goals.order_by("order", "created_at")
 
     popular_titles = {g["title"] for g in POPULAR_GOALS}
@@ -223,26 +253,39 @@ def goals_data(request):
         else:
             custom.append(item)
 
-    return JsonResponse({
+    return {
         "popular": popular,
         "custom": custom,
         "saved": saved
-    })
+    }
+
+
+@login_required
+@require_GET
+def goals_data(request):
+    return cached_json_response(
+        request, "goals", request.user.goals.all(),
+        lambda: _goals_payload(request.user),
+    )
+
+
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goal_toggle_select(request, pk):
     """
     Toggle selected/unselected state for a goal.
     EXACT match to tasks_toggle logic.
     """
-    goal = get_object_or_404(Goal, pk=pk, user=request.user)
-    goal.selected = not goal.selected
-    goal.save()
-    return JsonResponse({"ok": True, "selected": goal.selected})
+    result = flip_boolean(Goal, "selected", pk=pk, user=request.user)
+    if result is None:
+        raise Http404("No such goal")
+    return JsonResponse({"ok": True, "selected": result["selected"]})
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goals_save_selection(request):
     raw_ids = request.POST.getlist("selected_ids[]") or request.POST.getlist("selected_ids")
 
@@ -252,39 +295,28 @@ def goals_save_selection(request):
         selected_ids = set()
 
     qs = Goal.objects.filter(user=request.user)
+    now = timezone.now()
 
-    qs.update(selected=False)
+    # .update() skips auto_now, so updated_at is set explicitly
+    qs.update(selected=False, updated_at=now)
     if selected_ids:
-        qs.filter(id__in=selected_ids).update(selected=True)
+        qs.filter(id__in=selected_ids).update(selected=True, updated_at=now)
 
     return JsonResponse({"ok": True})
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goal_update_progress(request, pk):
     goal = get_object_or_404(Goal, pk=pk, user=request.user)
 
-    if goal.goal_type == "progress":
-        try:
-            progress = int(request.POST.get("progress", 0))
-        except (TypeError, ValueError):
-            return HttpResponseBadRequest("invalid progress")
-
-        progress = max(0, min(100, progress))
-
-        if goal.target_value:
-            goal.current_value = int((progress / 100.0) * goal.target_value)
-        else:
-            goal.current_value = progress
-
-        goal.completed = progress >= 100
-    else:
-        completed = request.POST.get("completed")
-        if completed is not None:
-            goal.completed = completed in ("1", "true", "True", "on")
+    try:
+        apply_progress(goal, request.POST)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
 
-    goal.save()
+    goal.save(update_fields=["current_value", "completed", "updated_at"])
     return JsonResponse({
         "ok": True,
         "progress": goal.progress_percentage() if hasattr(goal, "progress_percentage") else 0,
@@ -294,6 +326,7 @@ def goal_update_progress(request, pk):
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goal_create(request):
     title = request.POST.get("title", "").strip()
     gtype = request.POST.get("goal_type", "static")
@@ -319,43 +352,177 @@ def goal_create(request):
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goal_delete(request, pk):
     goal = get_object_or_404(Goal, pk=pk, user=request.user)
-    goal.delete()
+    with transaction.atomic():
+        record_deletions(request.user, Tombstone.KIND_GOAL, [goal.pk])
+        goal.delete()
     return JsonResponse({"ok": True})
 
 
+def _to_int(value):
+    """Parse an id from POST/JSON input; returns None when missing or invalid."""
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reorder_full(user, order_list):
+    """
+    Full-list mode: ``order`` is every saved goal id in display order.
+    Ownership is checked for the whole list in one query and only the
+    rows whose position actually changed are written, in one bulk UPDATE.
+    """
+    positions = {}
+    for idx, raw in enumerate(order_list):
+        gid = _to_int(raw)
+        if gid is not None and gid not in positions:
+            positions[gid] = idx
+
+    current = dict(
+        Goal.objects.filter(user=user, pk__in=positions).values_list("pk", "order")
+    )
+
+    now = timezone.now()
+    changed = [
+        Goal(pk=gid, order=positions[gid], updated_at=now)
+        for gid, order in current.items()
+        if order != positions[gid]
+    ]
+    if changed:
+        Goal.objects.bulk_update(changed, ["order", "updated_at"])
+
+    return len(changed)
+
+
+def _reorder_sparse(user, moved_id, after_id, before_id):
+    """
+    Sparse mode: a single drag sends the moved goal plus its new
+    neighbours (``after`` = the row now above it, ``before`` = the row
+    now below it). If there is a free slot between the neighbours the
+    moved row takes it, otherwise the rows below are shifted down with a
+    single ``order = order + 1`` UPDATE. Neighbours that share an order
+    value fall back to renumbering the saved list.
+
+    Returns the number of rows written, or None if any id is not owned
+    by the user.
+    """
+    wanted = {moved_id, after_id, before_id} - {None}
+    orders = dict(
+        Goal.objects.filter(user=user, pk__in=wanted).values_list("pk", "order")
+    )
+    if len(orders) != len(wanted):
+        return None
+
+    if (
+        after_id is not None
+        and before_id is not None
+        and orders[after_id] >= orders[before_id]
+    ):
+        # Tied (or stale) neighbours leave no position between them to
+        # take or shift into: renumber the saved list instead.
+        return _reorder_renumber(user, moved_id, after_id, before_id)
+
+    if before_id is not None:
+        target = orders[before_id]
+        if after_id is not None and orders[after_id] + 1 < target:
+            # Gap between the neighbours: no other row needs to move.
+            target = orders[after_id] + 1
+            shift_from = None
+        else:
+            shift_from = target
+    elif after_id is not None:
+        target = orders[after_id] + 1
+        shift_from = target
+    else:
+        return 0
+
+    now = timezone.now()
+    written = 0
+    if shift_from is not None:
+        written += (
+            Goal.objects.filter(user=user, order__gte=shift_from)
+            .exclude(pk=moved_id)
+            .update(order=models.F("order") + 1, updated_at=now)
+        )
+
+    if orders[moved_id] != target:
+        written += Goal.objects.filter(pk=moved_id).update(
+            order=target, updated_at=now
+        )
+
+    return written
+
+
+def _reorder_renumber(user, moved_id, after_id, before_id):
+    """
+    Place the moved goal next to its neighbours in the saved list as it
+    is displayed (order, then created_at) and renumber that list 0..n-1.
+    """
+    ids = list(
+        Goal.objects.filter(user=user, selected=True)
+        .exclude(pk=moved_id)
+        .order_by("order", "created_at", "pk")
+        .values_list("pk", flat=True)
+    )
+    if after_id in ids:
+        ids.insert(ids.index(after_id) + 1, moved_id)
+    elif before_id in ids:
+        ids.insert(ids.index(before_id), moved_id)
+    else:
+        ids.append(moved_id)
+    return _reorder_full(user, ids)
+
+
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def goal_reorder(request):
-    order_list = request.POST.getlist("order[]")
-
-    if not order_list:
+    """
+    Reorder saved goals. Accepts either the full list (``order[]``) or a
+    sparse ``moved`` + ``after``/``before`` payload for a single drag.
+    """
+    payload = {}
+    if not request.POST:
         try:
             payload = json.loads(request.body.decode() or "{}")
-            order_list = payload.get("order", [])
         except Exception:
-            order_list = []
-
-    for idx, gid in enumerate(order_list):
-        try:
-            g = Goal.objects.get(pk=int(gid), user=request.user)
-            g.order = idx
-            g.save()
-        except (Goal.DoesNotExist, ValueError, TypeError):
-            continue
+            payload = {}
+        if not isinstance(payload, dict):
+            payload = {}
+
+    def param(name):
+        return request.POST.get(name, payload.get(name))
+
+    moved_id = _to_int(param("moved"))
+
+    with transaction.atomic():
+        if moved_id is not None:
+            updated = _reorder_sparse(
+                request.user,
+                moved_id,
+                _to_int(param("after")),
+                _to_int(param("before")),
+            )
+            if updated is None:
+                return HttpResponseBadRequest("unknown goal")
+        else:
+            order_list = request.POST.getlist("order[]") or payload.get("order", [])
+            updated = _reorder_full(request.user, order_list)
 
-    return JsonResponse({"ok": True})
+    return JsonResponse({"ok": True, "updated": updated})
 
 
 # ---------------------------------------------------------
 # TASKS API
 # ---------------------------------------------------------
 
-@login_required
-@require_GET
-def tasks_list(request):
-    user_tasks_qs = request.user.tasks.all().order_by("order", "created_at")
+def _tasks_payload(user):
+    user_tasks_qs = user.tasks.all().order_by("order", "created_at")
     tasks_data = [_task_to_dict(t) for t in user_tasks_qs]
 
     title_to_task = {t.title: t for t in user_tasks_qs}
@@ -375,15 +542,25 @@ def tasks_list(request):
         _task_to_dict(t) for t in user_tasks_qs if t.title not in popular_titles
     ]
 
-    return JsonResponse({
+    return {
         "tasks": tasks_data,
         "popular": popular,
         "custom": custom_tasks,
-    })
+    }
+
+
+@login_required
+@require_GET
+def tasks_list(request):
+    return cached_json_response(
+        request, "tasks", request.user.tasks.all(),
+        lambda: _tasks_payload(request.user),
+    )
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def tasks_save_selection(request):
     titles = request.POST.getlist("titles[]", [])
 
@@ -399,44 +576,68 @@ def tasks_save_selection(request):
         cleaned.append(t)
 
     titles = cleaned
+    positions = {title: idx for idx, title in enumerate(titles)}
+
+    with transaction.atomic():
+        existing = list(
+            Task.objects.filter(user=request.user).values_list("id", "title", "order")
+        )
+        existing_titles = {title for _, title, _ in existing}
+
+        # Removed titles: one DELETE, plus their sync tombstones
+        removed = [pk for pk, title, _ in existing if title not in positions]
+        deleted = 0
+        if removed:
+            deleted, _ = Task.objects.filter(pk__in=removed).delete()
+            record_deletions(request.user, Tombstone.KIND_TASK, removed)
+
+        # Kept titles: one UPDATE for the rows whose position changed
+        now = timezone.now()
+        moved = [
+            Task(pk=pk, order=positions[title], updated_at=now)
+            for pk, title, order in existing
+            if title in positions and order != positions[title]
+        ]
+        if moved:
+            Task.objects.bulk_update(moved, ["order", "updated_at"])
+
+        # New titles: one INSERT
+        new_tasks = [
+            Task(user=request.user, title=title, order=idx)
+            for title, idx in positions.items()
+            if title not in existing_titles
+        ]
+        if new_tasks:
+            Task.objects.bulk_create(new_tasks)
 
-    existing_tasks = list(Task.objects.filter(user=request.user))
-    existing_by_title = {t.title: t for t in existing_tasks}
-    keep_titles = set(titles)
-
-    for t in existing_tasks:
-        if t.title not in keep_titles:
-            t.delete()
-
-    for idx, title in enumerate(titles):
-        task = existing_by_title.get(title)
-        if task:
-            task.order = idx
-            task.save()
-        else:
-            Task.objects.create(
-                user=request.user,
-                title=title,
-                order=idx,
-            )
-
-    return JsonResponse({"ok": True})
+    return JsonResponse({
+        "ok": True,
+        "written": {
+            "deleted": deleted,
+            "created": len(new_tasks),
+            "updated": len(moved),
+        },
+    })
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def task_toggle(request, pk):
-    t = get_object_or_404(Task, pk=pk, user=request.user)
-    t.completed = not t.completed
-    t.save()
-    return JsonResponse({"ok": True, "completed": t.completed})
+    result = flip_boolean(Task, "completed", pk=pk, user=request.user)
+    if result is None:
+        raise Http404("No such task")
+    return JsonResponse({"ok": True, "completed": result["completed"]})
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def task_delete(request, pk):
     t = get_object_or_404(Task, pk=pk, user=request.user)
-    t.delete()
+    with transaction.atomic():
+        record_deletions(request.user, Tombstone.KIND_TASK, [t.pk])
+        t.delete()
     return JsonResponse({"ok": True})
 
 
@@ -447,14 +648,30 @@ def task_delete(request, pk):
 @login_required
 @require_GET
 def notes_list(request):
-    notes = Note.objects.filter(user=request.user).order_by("-created_at")
-    return JsonResponse({
-        "notes": [_note_to_dict(n) for n in notes]
-    })
+    """
+    One keyset page of notes: the hot set by default (open notes first,
+    newest first), or the archive tier with ``?archived=1``. Send the
+    returned ``next`` back as ``?before=`` for the following page.
+    """
+    archived = request.GET.get("archived") in ("1", "true")
+    before = clean_cursor(request.GET.get("before"), archived)
+    page_size = get_notes_page_size(request)
+
+    def build():
+        items, next_cursor = notes_page(request.user, before, page_size, archived)
+        return {"notes": [_note_to_dict(n) for n in items], "next": next_cursor}
+
+    # Every note change (archiving included) bumps updated_at, so all of
+    # the user's notes validate every page
+    name = f"notes-{'archive' if archived else 'hot'}-{page_size}-{before or 'first'}"
+    return cached_json_response(
+        request, name, Note.objects.filter(user=request.user), build
+    )
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def note_create(request):
     text = request.POST.get("text", "").strip()   # <-- FIXED: strip(), not trim()
     if not text:
@@ -472,16 +689,80 @@ def note_create(request):
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def note_toggle(request, pk):
-    note = get_object_or_404(Note, pk=pk, user=request.user)
-    note.completed = not note.completed
-    note.save()
-    return JsonResponse({"ok": True, "completed": note.completed})
+    result = flip_boolean(
+        Note, "completed", returning=("archived",), pk=pk, user=request.user
+    )
+    if result is None:
+        raise Http404("No such note")
+    archived = bool(result["archived"])
+    if archived and not result["completed"]:
+        restore_notes(request.user, [pk])
+        archived = False
+    return JsonResponse({"ok": True, "completed": result["completed"], "archived": archived})
 
 
 @login_required
 @require_POST
+@invalidates_dashboard_cache
 def note_delete(request, pk):
     note = get_object_or_404(Note, pk=pk, user=request.user)
-    note.delete()
+    with transaction.atomic():
+        record_deletions(request.user, Tombstone.KIND_NOTE, [note.pk])
+        note.delete()
     return JsonResponse({"ok": True})
+
+
+# ---------------------------------------------------------
+# SYNC
+# ---------------------------------------------------------
+
+@login_required
+@require_GET
+def api_sync(request):
+    """
+    Delta feed over tasks, goals and notes: rows changed after
+    ``?since=<token>`` plus ``deleted`` tombstones. Start without a token,
+    then keep sending back the returned ``since`` (repeat while
+    ``has_more``). On ``reset`` the client must discard its local copy.
+    """
+    result = sync_changes(
+        request.user,
+        since=request.GET.get("since"),
+        page_size=get_page_size(request),
+    )
+
+    return JsonResponse({
+        "tasks": [_task_to_dict(t) for t in result["tasks"]],
+        "goals": [_goal_to_dict(g) for g in result["goals"]],
+        "notes": [_note_to_dict(n) for n in result["notes"]],
+        "deleted": [{"kind": d.kind, "id": d.object_id} for d in result["deleted"]],
+        "since": result["since"],
+        "has_more": result["has_more"],
+        "reset": result["reset"],
+    })
+
+
+# ---------------------------------------------------------
+# BATCH
+# ---------------------------------------------------------
+
+@login_required
+@require_POST
+@invalidates_dashboard_cache
+def api_batch(request):
+    """
+    Apply ``{"ops": [...]}`` (toggle/create/delete/progress on tasks,
+    goals and notes) in order, in one transaction. Any invalid operation
+    rejects the whole batch; ids the user does not own are reported per
+    operation as ``not_found``.
+    """
+    try:
+        payload = json.loads(request.body.decode() or "{}")
+        ops = parse_operations(payload.get("ops") if isinstance(payload, dict) else None)
+        results, written = apply_batch(request.user, ops)
+    except (ValueError, UnicodeDecodeError) as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    return JsonResponse({"ok": True, "results": results, "written": written})
@@ -0,0 +1,157 @@
+# messaging/actions.py
+"""
+Set-based message actions shared by the HTML views and the JSON API.
+
+Every action takes a queryset of candidate messages and applies the same
+permission rules as the single-message views inside the statement itself,
+so acting on many messages costs a fixed number of statements. Queryset
+updates skip model signals, so each action bumps ``updated_at`` and
+resets the unread counters it may have changed.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import DeletedMessage, Message
+from .unread import invalidate_unread_count
+
+ACTIONS = ("archive", "unarchive", "trash", "restore", "purge")
+
+# Result codes for per-id reporting
+OK = "ok"
+NOT_FOUND = "not_found"
+FORBIDDEN = "forbidden"
+
+
+def _as_recipient(qs, user):
+    return qs if user.is_superuser else qs.filter(recipient=user)
+
+
+def _as_sender(qs, user):
+    return qs if user.is_superuser else qs.filter(sender=user)
+
+
+def _as_participant(qs, user):
+    if user.is_superuser:
+        return qs
+    return qs.filter(models.Q(sender=user) | models.Q(recipient=user))
+
+
+def _recipients(qs):
+    return list(qs.values_list("recipient_id", flat=True).distinct())
+
+
+def set_archived(qs, user, archived):
+    """Archive/unarchive; only the recipient (or a superuser) may."""
+    qs = _as_recipient(qs, user)
+    recipients = [user.pk] if not user.is_superuser else _recipients(qs)
+    updated = qs.update(archived=archived, updated_at=timezone.now())
+    invalidate_unread_count(*recipients)
+    return updated
+
+
+def set_trashed(qs, user, trashed):
+    """
+    Move to / restore from trash on whichever side(s) ``user`` is on:
+    the sender flag for messages they sent, the recipient flag for
+    messages they received (both for superusers).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        received = _as_recipient(qs, user)
+        recipients = [user.pk] if not user.is_superuser else _recipients(received)
+        sent_count = _as_sender(qs, user).update(
+            deleted_by_sender=trashed, updated_at=now
+        )
+        received_count = received.update(
+            deleted_by_recipient=trashed, updated_at=now
+        )
+    invalidate_unread_count(*recipients)
+    # Superusers flag both sides of the same rows
+    if user.is_superuser:
+        return max(sent_count, received_count)
+    return sent_count + received_count
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "MESSAGING_SYNC_TOMBSTONE_DAYS", 30))
+
+
+def purge(qs, user):
+    """
+    Permanently delete; the sender or recipient (or a superuser) may.
+    Both participants get a DeletedMessage for the delta feed. A fixed
+    number of statements however many messages match.
+    """
+    with transaction.atomic():
+        rows = list(_as_participant(qs, user).values_list("pk", "sender_id", "recipient_id"))
+        if not rows:
+            return 0
+        now = timezone.now()
+        DeletedMessage.objects.bulk_create([
+            DeletedMessage(user_id=participant, message_id=pk, deleted_at=now)
+            for pk, sender_id, recipient_id in rows
+            for participant in {sender_id, recipient_id}
+        ])
+        # Nothing references Message, so the rows need not be collected
+        # first; skipping that also skips the per-row post_delete signal,
+        # and the counts are reset once per recipient below instead
+        doomed = Message.objects.filter(pk__in=[pk for pk, _, _ in rows])
+        deleted = doomed._raw_delete(doomed.db)
+    invalidate_unread_count(*{recipient_id for _, _, recipient_id in rows})
+    return deleted
+
+
+def apply_action(action, qs, user):
+    if action == "archive":
+        return set_archived(qs, user, True)
+    if action == "unarchive":
+        return set_archived(qs, user, False)
+    if action == "trash":
+        return set_trashed(qs, user, True)
+    if action == "restore":
+        return set_trashed(qs, user, False)
+    if action == "purge":
+        return purge(qs, user)
+    raise ValueError(f"Unknown action: {action}")
+
+
+def check_ids(action, ids, user):
+    """
+    Per-id outcome of ``action`` for ``user`` ({id: ok|not_found|forbidden})
+    from a single query. The action itself still re-checks permissions.
+    """
+    results = {pk: NOT_FOUND for pk in ids}
+    rows = Message.objects.filter(pk__in=ids).values_list(
+        "pk", "sender_id", "recipient_id"
+    )
+
+    for pk, sender_id, recipient_id in rows:
+        if user.is_superuser:
+            allowed = True
+        elif action in ("archive", "unarchive"):
+            allowed = recipient_id == user.pk
+        else:
+            allowed = user.pk in (sender_id, recipient_id)
+        results[pk] = OK if allowed else FORBIDDEN
+
+    return results
+
+
+def bulk_apply(action, user, ids=None, folder=None):
+    """
+    Apply ``action`` to explicit ``ids`` or to every message in ``folder``.
+    Returns (count, results); results is the per-id report in ids mode and
+    None in folder mode.
+    """
+    if folder is not None:
+        return apply_action(action, Message.objects.folder(folder, user), user), None
+
+    results = check_ids(action, ids, user)
+    allowed = [pk for pk, status in results.items() if status == OK]
+    count = 0
+    if allowed:
+        count = apply_action(action, Message.objects.filter(pk__in=allowed), user)
+    return count, results
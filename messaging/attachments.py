@@ -0,0 +1,203 @@
+# messaging/attachments.py
+"""
+Attachment upload limits and streamed, range-aware downloads.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils.http import content_disposition_header, parse_etags
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def max_upload_size():
+    return getattr(settings, "MESSAGING_ATTACHMENT_MAX_SIZE", 10 * 1024 * 1024)
+
+
+def chunk_size():
+    return getattr(settings, "MESSAGING_ATTACHMENT_CHUNK_SIZE", 64 * 1024)
+
+
+# -------------------------
+# Upload
+# -------------------------
+class AttachmentSizeLimitHandler(FileUploadHandler):
+    """
+    First handler in the chain: counts bytes as chunks arrive and drops the
+    file as soon as it passes the cap, before the rest is written to the
+    temporary file. Sets ``request.attachment_too_large`` so the view can
+    report it.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.chunk_size = chunk_size()
+        self.max_size = max_upload_size()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.request.attachment_too_large = True
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+# -------------------------
+# Download
+# -------------------------
+def _etag(field):
+    storage = field.storage
+    size = storage.size(field.name)
+    try:
+        mtime = storage.get_modified_time(field.name).timestamp()
+    except NotImplementedError:
+        mtime = ""
+    digest = hashlib.md5(f"{field.name}|{size}|{mtime}".encode()).hexdigest()
+    return f'"{digest}"', size
+
+
+def _none_match(header, etag):
+    """
+    If-None-Match test: ``*`` or any listed entity tag, compared weakly
+    (a ``W/`` prefix on either side is ignored).
+    """
+    tags = parse_etags(header or "")
+    if tags == ["*"]:
+        return True
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def _parse_range(header, size):
+    """
+    (start, end) inclusive for a single ``bytes=`` range, None when the
+    header should be ignored (absent, malformed or multi-range), or
+    ``False`` when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _stream(fh, start, length, block):
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = fh.read(min(block, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        fh.close()
+
+
+def _sendfile_response(field, filename):
+    """
+    Hand the transfer to the front proxy when configured; the proxy then
+    handles ranges and caching itself.
+    """
+    mode = getattr(settings, "MESSAGING_ATTACHMENT_SENDFILE", "")
+    if not mode:
+        return None
+
+    response = HttpResponse()
+    if mode == "x-accel-redirect":
+        prefix = getattr(
+            settings, "MESSAGING_ATTACHMENT_ACCEL_PREFIX", "/protected-media/"
+        )
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + field.name
+    elif mode == "x-sendfile":
+        response["X-Sendfile"] = field.path
+    else:
+        return None
+
+    # Let the proxy pick the type from the file
+    del response["Content-Type"]
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def attachment_response(request, field):
+    """
+    Serve ``field`` (a FieldFile) to an already-authorised user: proxy
+    handoff if configured, otherwise streamed from storage in fixed-size
+    chunks with ETag/If-None-Match and single-range support.
+    """
+    filename = os.path.basename(field.name)
+
+    response = _sendfile_response(field, filename)
+    if response is not None:
+        return response
+
+    etag, size = _etag(field)
+    if _none_match(request.headers.get("If-None-Match"), etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    byte_range = None
+    # If-Range needs a strong match; a date or weak tag means "send it all"
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range == etag:
+        byte_range = _parse_range(request.headers.get("Range"), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    fh = field.storage.open(field.name, "rb")
+
+    if byte_range is None:
+        response = FileResponse(fh, as_attachment=True, filename=filename)
+        response.block_size = chunk_size()
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _stream(fh, start, length, chunk_size()),
+            status=206,
+            content_type=mimetypes.guess_type(filename)[0]
+            or "application/octet-stream",
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    # Access-controlled: browsers may keep it but must revalidate
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,15 +1,14 @@
 # messaging/context_processors.py
-from .models import Message
+from django.utils.functional import SimpleLazyObject
+
+from .unread import unread_count
+
 
 def messaging_unread_counts(request):
     if not request.user.is_authenticated:
         return {"inbox_unread_count": 0}
 
-    unread_count = Message.objects.filter(
-        recipient=request.user,
-        archived=False,
-        is_read=False,
-        deleted_by_recipient=False,
-    ).count()
-
-    return {"inbox_unread_count": unread_count}
+    # Lazy: only hits the cache/DB when a template actually renders it
+    return {
+        "inbox_unread_count": SimpleLazyObject(lambda: unread_count(request.user))
+    }
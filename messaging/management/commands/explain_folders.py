@@ -0,0 +1,66 @@
+# messaging/management/commands/explain_folders.py
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from messaging.models import FOLDERS, Message
+from productivityhub.pagination import keyset_query
+from messaging.unread import unread_query
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan (EXPLAIN ANALYZE on PostgreSQL) for each "
+        "messaging folder page exactly as the views run it, to check the "
+        "folder indexes are used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose folders are explained")
+        parser.add_argument(
+            "--folder",
+            choices=FOLDERS,
+            action="append",
+            help="Only explain this folder (repeatable). Default: all.",
+        )
+        parser.add_argument(
+            "--before",
+            help="Page cursor (a next_cursor from the folder API). Default: first page.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=getattr(settings, "MESSAGING_PAGE_SIZE", 50),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+
+        # SQLite only supports EXPLAIN QUERY PLAN (no ANALYZE/BUFFERS)
+        explain_options = {}
+        if connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        queries = [
+            (
+                name,
+                keyset_query(
+                    Message.objects.folder(name, user).for_listing(),
+                    before=options["before"],
+                    page_size=options["page_size"],
+                ),
+            )
+            for name in options["folder"] or FOLDERS
+        ]
+        if not options["folder"]:
+            queries.append(("unread count", unread_query(user)))
+
+        for name, qs in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name} =="))
+            self.stdout.write(str(qs.query))
+            self.stdout.write(qs.explain(**explain_options))
+            self.stdout.write("")
@@ -0,0 +1,18 @@
+# messaging/management/commands/prune_message_tombstones.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from messaging.actions import tombstone_retention
+from messaging.models import DeletedMessage
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete purged-message markers older than MESSAGING_SYNC_TOMBSTONE_DAYS. "
+        "Clients holding older sync tokens get a full resync instead."
+    )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - tombstone_retention()
+        deleted, _ = DeletedMessage.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"pruned {deleted} message tombstone(s)")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_message_attachment_message_deleted_by_recipient_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('archived', False), ('deleted_by_recipient', False)), fields=['recipient', '-created_at'], name='msg_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_sender', False)), fields=['sender', '-created_at'], name='msg_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('archived', True), ('deleted_by_recipient', False)), fields=['recipient', '-created_at'], name='msg_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_sender', True)), fields=['sender', '-created_at'], name='msg_trash_sender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_recipient', True)), fields=['recipient', '-created_at'], name='msg_trash_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('archived', False), ('deleted_by_recipient', False), ('is_read', False)), fields=['recipient'], name='msg_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_message_folder_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='msg_inbox_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='msg_sent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='msg_archived_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='msg_trash_sender_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='msg_trash_recipient_idx',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('archived', False), ('deleted_by_recipient', False)), fields=['recipient', '-created_at', '-id'], name='msg_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_sender', False)), fields=['sender', '-created_at', '-id'], name='msg_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('archived', True), ('deleted_by_recipient', False)), fields=['recipient', '-created_at', '-id'], name='msg_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_sender', True)), fields=['sender', '-created_at', '-id'], name='msg_trash_sender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_by_recipient', True)), fields=['recipient', '-created_at', '-id'], name='msg_trash_recipient_idx'),
+        ),
+    ]
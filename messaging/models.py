@@ -4,6 +4,73 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 
 
+class MessageQuerySet(models.QuerySet):
+    """
+    Folder predicates shared by the views and the index tooling.
+    Superusers see every user's messages in each folder.
+    """
+
+    def inbox(self, user):
+        qs = self.filter(archived=False, deleted_by_recipient=False)
+        if not user.is_superuser:
+            qs = qs.filter(recipient=user)
+        return qs
+
+    def sent(self, user):
+        qs = self.filter(deleted_by_sender=False)
+        if not user.is_superuser:
+            qs = qs.filter(sender=user)
+        return qs
+
+    def archived(self, user):
+        qs = self.filter(archived=True, deleted_by_recipient=False)
+        if not user.is_superuser:
+            qs = qs.filter(recipient=user)
+        return qs
+
+    def trash(self, user):
+        if user.is_superuser:
+            return self.filter(
+                models.Q(deleted_by_sender=True) | models.Q(deleted_by_recipient=True)
+            )
+        return self.filter(
+            models.Q(sender=user, deleted_by_sender=True)
+            | models.Q(recipient=user, deleted_by_recipient=True)
+        )
+
+    def for_listing(self):
+        """
+        Columns the folder templates render, with both users joined in,
+        so a page costs one query however many rows it shows.
+        """
+        return self.select_related("sender", "recipient").only(
+            "subject",
+            "created_at",
+            "updated_at",
+            "is_read",
+            "archived",
+            "deleted_by_sender",
+            "deleted_by_recipient",
+            "attachment",
+            "sender__username",
+            "recipient__username",
+        )
+
+    def involving(self, user):
+        """Messages ``user`` may act on: all for superusers, else sent/received."""
+        if user.is_superuser:
+            return self.all()
+        return self.filter(models.Q(sender=user) | models.Q(recipient=user))
+
+    def folder(self, name, user):
+        if name not in FOLDERS:
+            raise ValueError(f"Unknown folder: {name}")
+        return getattr(self, name)(user)
+
+
+FOLDERS = ("inbox", "sent", "archived", "trash")
+
+
 class Message(models.Model):
     sender = models.ForeignKey(
         User, related_name="sent_messages", on_delete=models.CASCADE
@@ -24,6 +91,10 @@ class Message(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now)
 
+    # Bumped on every change (bulk UPDATEs set it explicitly); drives the
+    # API delta feed
+    updated_at = models.DateTimeField(auto_now=True)
+
     # Status flags
     is_read = models.BooleanField(default=False)
     archived = models.BooleanField(default=False)
@@ -32,12 +103,95 @@ class Message(models.Model):
     deleted_by_sender = models.BooleanField(default=False)
     deleted_by_recipient = models.BooleanField(default=False)
 
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        # One partial index per folder predicate, in keyset page order
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="msg_inbox_idx",
+                condition=models.Q(archived=False, deleted_by_recipient=False),
+            ),
+            models.Index(
+                fields=["sender", "-created_at", "-id"],
+                name="msg_sent_idx",
+                condition=models.Q(deleted_by_sender=False),
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="msg_archived_idx",
+                condition=models.Q(archived=True, deleted_by_recipient=False),
+            ),
+            models.Index(
+                fields=["sender", "-created_at", "-id"],
+                name="msg_trash_sender_idx",
+                condition=models.Q(deleted_by_sender=True),
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="msg_trash_recipient_idx",
+                condition=models.Q(deleted_by_recipient=True),
+            ),
+            # API delta feed: changes per participant since a cursor
+            models.Index(
+                fields=["recipient", "updated_at", "id"],
+                name="msg_recipient_sync_idx",
+            ),
+            models.Index(
+                fields=["sender", "updated_at", "id"],
+                name="msg_sender_sync_idx",
+            ),
+            # Unread badge count
+            models.Index(
+                fields=["recipient"],
+                name="msg_unread_idx",
+                condition=models.Q(
+                    is_read=False, archived=False, deleted_by_recipient=False
+                ),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.subject} ({self.sender} → {self.recipient})"
 
+    @property
+    def attachment_is_image(self):
+        name = (self.attachment.name or "").lower()
+        return name.endswith((".png", ".jpg", ".jpeg", ".webp", ".gif"))
+
+    def folder_for(self, user):
+        """
+        Folder this message shows up in for ``user``; superusers who are
+        not a participant see it from the recipient's side.
+        """
+        if user.pk == self.sender_id and user.pk != self.recipient_id:
+            return "trash" if self.deleted_by_sender else "sent"
+        if self.deleted_by_recipient:
+            return "trash"
+        return "archived" if self.archived else "inbox"
+
     def is_deleted_for(self, user):
         if user == self.sender:
             return self.deleted_by_sender
         if user == self.recipient:
             return self.deleted_by_recipient
         return True
+
+
+class DeletedMessage(models.Model):
+    """
+    Left behind for both participants when a message is purged, so the
+    API delta feed can tell clients to drop it. Pruned after
+    MESSAGING_SYNC_TOMBSTONE_DAYS by ``prune_message_tombstones``.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="deleted_messages")
+    message_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"], name="msg_tombstone_sync_idx"),
+            models.Index(fields=["deleted_at"], name="msg_tombstone_prune_idx"),
+        ]
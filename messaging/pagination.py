@@ -0,0 +1,13 @@
+# messaging/pagination.py
+from django.conf import settings
+
+from productivityhub.pagination import MAX_PAGE_SIZE
+
+
+def get_page_size(request):
+    default = getattr(settings, "MESSAGING_PAGE_SIZE", 50)
+    try:
+        size = int(request.GET.get("page_size", default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
@@ -0,0 +1,14 @@
+# messaging/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Message
+from .unread import invalidate_unread_count
+
+
+# post_delete covers deletes outside actions.purge() (admin, user
+# cascades); purge() deletes without signals and resets the counts itself
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def reset_unread_count(sender, instance, **kwargs):
+    invalidate_unread_count(instance.recipient_id)
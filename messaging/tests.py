@@ -1,3 +1,391 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from productivityhub.pagination import SYNC_OVERLAP, encode_position
+from productivityhub.testing import Fixtures, QueryBudgetMixin
+
+from .actions import bulk_apply, purge
+from .models import DeletedMessage, Message
+from .unread import invalidate_unread_count, unread_count
+
+
+class FolderQueryCountTests(TestCase):
+    """
+    Folder pages must not issue a query per message (sender/recipient
+    lookups in the list templates).
+    """
+
+    FOLDERS = ["inbox", "sent_messages", "archived_messages", "trash"]
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.other = User.objects.create_user("bob", password="pw")
+
+    def make_messages(self, count):
+        """One message in and one out per new correspondent, across folders."""
+        start = User.objects.count()
+        for i in range(start, start + count):
+            other = User.objects.create_user(f"user{i}")
+            flags = [{}, {"archived": True}, {"deleted_by_recipient": True}][i % 3]
+            Message.objects.create(
+                sender=other, recipient=self.user, subject=f"in {i}", body="x", **flags
+            )
+            Message.objects.create(
+                sender=self.user,
+                recipient=other,
+                subject=f"out {i}",
+                body="x",
+                deleted_by_sender=(i % 2 == 0),
+            )
+
+    def count_queries(self, url_name):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, user):
+        self.client.force_login(user)
+        # Warm per-user caches (avatar key) so both runs start equal
+        self.client.get(reverse("inbox"))
+
+        self.make_messages(3)
+        small = {name: self.count_queries(name) for name in self.FOLDERS}
+
+        self.make_messages(30)
+        large = {name: self.count_queries(name) for name in self.FOLDERS}
+
+        self.assertEqual(small, large)
+
+    def test_folder_query_count_is_constant(self):
+        self.assert_constant_queries(self.user)
+
+    def test_superuser_folder_query_count_is_constant(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assert_constant_queries(self.user)
+
+    def test_list_query_skips_body(self):
+        Message.objects.create(
+            sender=self.other, recipient=self.user, subject="hi", body="x" * 1000
+        )
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("inbox"))
+
+        folder_sql = [
+            q["sql"] for q in ctx.captured_queries
+            if 'FROM "messaging_message"' in q["sql"]
+        ]
+        self.assertTrue(folder_sql)
+        self.assertTrue(all('"body"' not in sql for sql in folder_sql))
+
+
+class MessagingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets for the folders, the message page and the JSON API."""
+
+    # Every request starts with the session and user lookups (2); pages
+    # add the navbar's avatar key and unread count (2).
+    BUDGETS = {
+        # 2 + one keyset page (sender/recipient joined) + navbar
+        "inbox": 5,
+        "sent_messages": 5,
+        "archived_messages": 5,
+        "trash": 5,
+        # 2 + message + sender + recipient + mark read + navbar
+        "message_detail": 8,
+        # 2 + one keyset page
+        "api_message_folder": 3,
+        # 2 + one changes_since page
+        "api_message_sync": 3,
+        # ... + purged ids since the token
+        "api_message_sync:delta": 4,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def grow(self, size):
+        """One message in and one out per correspondent, across folders."""
+        for i in range(Message.objects.filter(recipient=self.user).count(), size):
+            other = User.objects.create_user(f"correspondent{i}")
+            flags = [{}, {"archived": True}, {"deleted_by_recipient": True}][i % 3]
+            Message.objects.create(
+                sender=other, recipient=self.user, subject=f"in {i}", body="x", **flags
+            )
+            Message.objects.create(
+                sender=self.user, recipient=other, subject=f"out {i}", body="x",
+                deleted_by_sender=(i % 2 == 0),
+            )
+        self.fixtures = Fixtures.for_user(self.user)
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets(self.BUDGETS, self.grow, sizes=(3, 30))
+
+
+class UnreadCountTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.msg = Message.objects.create(
+            sender=self.bob, recipient=self.alice, subject="hi", body="x"
+        )
+
+    def test_purge_resets_the_recipients_count(self):
+        self.assertEqual(unread_count(self.alice), 1)
+
+        self.client.force_login(self.bob)
+        self.client.get(reverse("permanent_delete", args=[self.msg.pk]))
+
+        self.assertEqual(unread_count(self.alice), 0)
+
+    def test_empty_trash_is_one_delete_for_any_number_of_messages(self):
+        for count in (3, 30):
+            Message.objects.bulk_create([
+                Message(sender=self.bob, recipient=self.alice, subject="x", body="x",
+                        deleted_by_sender=True)
+                for _ in range(count)
+            ])
+            invalidate_unread_count(self.alice.pk)  # bulk_create sends no signals
+            self.assertEqual(unread_count(self.alice), count + 1)
+
+            # savepoint, read ids, INSERT tombstones, DELETE, release
+            with self.assertNumQueries(5):
+                purged, _ = bulk_apply("purge", self.bob, folder="trash")
+
+            self.assertEqual(purged, count)
+            self.assertEqual(unread_count(self.alice), 1)
+
+    def test_deletes_outside_purge_reset_the_count(self):
+        self.assertEqual(unread_count(self.alice), 1)
+
+        self.bob.delete()  # cascades to the message
+
+        self.assertEqual(unread_count(self.alice), 0)
+
+
+class SyncFeedTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.client.force_login(self.alice)
+
+    def sync(self, since=None):
+        params = {"since": since} if since else {}
+        return self.client.get(reverse("api_message_sync"), params).json()
+
+    def test_late_commit_behind_the_cursor_is_still_delivered(self):
+        first = Message.objects.create(sender=self.bob, recipient=self.alice, subject="a", body="x")
+        since = self.sync()["since"]
+
+        # Stamped before ``first`` but committed after the client synced
+        late = Message.objects.create(sender=self.bob, recipient=self.alice, subject="b", body="x")
+        Message.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(seconds=1))
+
+        ids = [m["id"] for m in self.sync(since)["messages"]]
+        self.assertIn(late.pk, ids)
+
+    def test_settled_rows_are_not_sent_again(self):
+        msg = Message.objects.create(sender=self.bob, recipient=self.alice, subject="a", body="x")
+        Message.objects.filter(pk=msg.pk).update(
+            updated_at=timezone.now() - SYNC_OVERLAP - timedelta(seconds=5)
+        )
+        since = self.sync()["since"]
+
+        self.assertEqual(self.sync(since)["messages"], [])
+
+    def test_purged_message_is_reported_by_the_next_sync(self):
+        msg = Message.objects.create(sender=self.bob, recipient=self.alice, subject="a", body="x")
+        since = self.sync()["since"]
+
+        self.client.force_login(self.bob)
+        self.client.get(reverse("permanent_delete", args=[msg.pk]))
+        self.client.force_login(self.alice)
+
+        data = self.sync(since)
+        self.assertEqual(data["deleted"], [msg.pk])
+        self.assertFalse(data["reset"])
+
+    def test_deletions_are_not_repeated_once_settled(self):
+        msg = Message.objects.create(sender=self.bob, recipient=self.alice, subject="a", body="x")
+        since = self.sync()["since"]
+        purge(Message.objects.filter(pk=msg.pk), self.bob)
+        DeletedMessage.objects.update(deleted_at=timezone.now() - SYNC_OVERLAP - timedelta(seconds=5))
+
+        since = self.sync(since)["since"]
+
+        self.assertEqual(self.sync(since)["deleted"], [])
+
+    def test_expired_or_malformed_tokens_reset(self):
+        old = encode_position(timezone.now() - timedelta(days=31), 0)
+
+        self.assertTrue(self.sync(old)["reset"])
+        self.assertTrue(self.sync("not-a-token")["reset"])
+
+    def test_pages_within_one_sync_do_not_overlap(self):
+        for n in range(5):
+            Message.objects.create(sender=self.bob, recipient=self.alice, subject=str(n), body="x")
+
+        seen, since = [], None
+        while True:
+            data = self.client.get(
+                reverse("api_message_sync"), {"page_size": 2, **({"since": since} if since else {})}
+            ).json()
+            seen += [m["id"] for m in data["messages"]]
+            since = data["since"]
+            if not data["has_more"]:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+
+class AttachmentTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media = override_settings(MEDIA_ROOT=self.media.name, MESSAGING_ATTACHMENT_SENDFILE="")
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.msg = Message.objects.create(sender=self.bob, recipient=self.alice, subject="a", body="x")
+        self.msg.attachment.save("notes.txt", ContentFile(b"0123456789"))
+        self.url = reverse("attachment_download", args=[self.msg.pk])
+        self.client.force_login(self.alice)
+
+    def get(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def test_full_download_carries_validators(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["ETag"].startswith('"'))
+
+    def test_if_none_match(self):
+        etag = self.get()["ETag"]
+
+        for header in (etag, f'"other", {etag}', f"W/{etag}", "*"):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(If_None_Match=header).status_code, 304)
+
+        # A longer tag that merely contains ours is a different tag
+        self.assertEqual(self.get(If_None_Match=f'"x{etag[1:-1]}x"').status_code, 200)
+
+    def test_single_range(self):
+        response = self.get(Range="bytes=2-5")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+
+        response = self.get(Range="bytes=-3")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range="bytes=20-30")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_if_range(self):
+        etag = self.get()["ETag"]
+
+        self.assertEqual(self.get(Range="bytes=0-1", If_Range=etag).status_code, 206)
+        # Changed (or weak) validator: the whole file instead of a range
+        self.assertEqual(self.get(Range="bytes=0-1", If_Range='"stale"').status_code, 200)
+        self.assertEqual(self.get(Range="bytes=0-1", If_Range=f"W/{etag}").status_code, 200)
+
+    def test_other_users_cannot_download(self):
+        self.client.force_login(User.objects.create_user("eve", password="pw"))
+
+        self.assertEqual(self.get().status_code, 403)
+
+
+class ComposeTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media = override_settings(MEDIA_ROOT=self.media.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+
+    def post(self, client, **extra):
+        data = {"recipient": self.bob.pk, "subject": "hi", "body": "x", **extra}
+        return client.post(reverse("compose_message"), data)
+
+    @override_settings(MESSAGING_ATTACHMENT_MAX_SIZE=16, MESSAGING_ATTACHMENT_CHUNK_SIZE=8)
+    def test_oversized_attachment_is_rejected(self):
+        self.client.force_login(self.alice)
+
+        response = self.post(self.client, attachment=SimpleUploadedFile("big.bin", b"x" * 64))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response.context["form"].errors)
+        self.assertFalse(Message.objects.exists())
+
+    @override_settings(MESSAGING_ATTACHMENT_MAX_SIZE=16, MESSAGING_ATTACHMENT_CHUNK_SIZE=8)
+    def test_attachment_under_the_cap_is_saved(self):
+        self.client.force_login(self.alice)
+
+        self.post(self.client, attachment=SimpleUploadedFile("small.txt", b"x" * 10))
+
+        self.assertEqual(Message.objects.get().attachment.size, 10)
+
+    def test_csrf_is_still_enforced(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.alice)
+
+        response = self.post(client)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Message.objects.exists())
+
+        token = client.get(reverse("compose_message")).context["csrf_token"]
+        self.post(client, csrfmiddlewaretoken=token)
+        self.assertTrue(Message.objects.exists())
+
+
+class ToggleArchiveTests(TestCase):
+
+    def test_archive_flips_in_one_update(self):
+        alice = User.objects.create_user("alice", password="pw")
+        bob = User.objects.create_user("bob", password="pw")
+        msg = Message.objects.create(sender=bob, recipient=alice, subject="a", body="x")
+        self.client.force_login(alice)
+
+        for expected in (True, False):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse("toggle_archive", args=[msg.pk]))
+
+            msg.refresh_from_db()
+            self.assertEqual(msg.archived, expected)
+            statements = [q["sql"] for q in ctx.captured_queries if "messaging_message" in q["sql"]]
+            self.assertEqual(len(statements), 1, statements)
+            self.assertTrue(statements[0].startswith("UPDATE"))
+
+        # Only the recipient may archive
+        self.client.force_login(bob)
+        self.assertEqual(self.client.get(reverse("toggle_archive", args=[msg.pk])).status_code, 403)
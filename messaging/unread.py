@@ -0,0 +1,39 @@
+# messaging/unread.py
+from django.core.cache import cache
+
+from .models import Message
+
+# Safety net only: every write path invalidates the key explicitly
+UNREAD_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id):
+    return f"messaging:unread:{user_id}"
+
+
+def unread_query(user):
+    return Message.objects.filter(
+        recipient=user,
+        archived=False,
+        is_read=False,
+        deleted_by_recipient=False,
+    )
+
+
+def unread_count(user):
+    """
+    Number of unread inbox messages for ``user``, served from the cache
+    and recomputed only after invalidate_unread_count().
+    """
+    key = _cache_key(user.pk)
+    count = cache.get(key)
+
+    if count is None:
+        count = unread_query(user).count()
+        cache.set(key, count, UNREAD_CACHE_TIMEOUT)
+
+    return count
+
+
+def invalidate_unread_count(*user_ids):
+    cache.delete_many([_cache_key(uid) for uid in user_ids])
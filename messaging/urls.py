@@ -20,9 +20,18 @@ urlpatterns = [
     # Message detail
     path("message/<int:pk>/", views.message_detail, name="message_detail"),
 
+    # Attachment download (streamed, supports Range)
+    path("message/<int:pk>/attachment/", views.attachment_download, name="attachment_download"),
+
     # Message actions
     path("message/<int:pk>/archive/", views.toggle_archive, name="toggle_archive"),
     path("message/<int:pk>/delete/", views.delete_message, name="delete_message"),
     path("message/<int:pk>/restore/", views.restore_message, name="restore_message"),
     path("message/<int:pk>/permanent-delete/", views.permanent_delete, name="permanent_delete"),
+    path("bulk/", views.bulk_action, name="bulk_message_action"),
+
+    # JSON API
+    path("api/folders/<str:folder>/", views.api_folder, name="api_message_folder"),
+    path("api/sync/", views.api_sync, name="api_message_sync"),
+    path("api/actions/", views.api_actions, name="api_message_actions"),
 ]
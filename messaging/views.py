@@ -2,10 +2,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import HttpResponseForbidden
-from django.db import models  # needed for models.Q
-from .models import Message
+from django.http import (
+    Http404, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+)
+from django.template.defaultfilters import filesizeformat
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_GET, require_POST
+import json
+
+from productivityhub.db import flip_boolean
+from productivityhub.pagination import changes_since, decode_cursor, keyset_page
+from .actions import ACTIONS, bulk_apply, purge, set_trashed, tombstone_retention
+from .attachments import (
+    AttachmentSizeLimitHandler, attachment_response, max_upload_size,
+)
+from .models import FOLDERS, DeletedMessage, Message
 from .forms import MessageForm
+from .pagination import get_page_size
+from .unread import invalidate_unread_count
 
 
 # -------------------------
@@ -21,6 +38,26 @@ def user_can_access(msg, user):
     return msg.sender == user or msg.recipient == user
 
 
+# -------------------------
+# Helper: one page of a folder
+# -------------------------
+def folder_context(request, qs, folder):
+    """
+    Template context for one keyset-paginated page of a folder.
+    """
+    page_size = get_page_size(request)
+    items, next_cursor = keyset_page(
+        qs.for_listing(), before=request.GET.get("before"), page_size=page_size
+    )
+    return {
+        "messages": items,
+        "folder": folder,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("before"),
+        "page_size": page_size,
+    }
+
+
 # -------------------------
 # Inbox
 # -------------------------
@@ -30,24 +67,12 @@ def inbox(request):
     Superusers: all non-archived, non-deleted messages (as recipient).
     Normal users: messages where they are the recipient.
     """
-    if request.user.is_superuser:
-        qs = Message.objects.filter(
-            archived=False,
-            deleted_by_recipient=False,
-        )
-    else:
-        qs = Message.objects.filter(
-            recipient=request.user,
-            archived=False,
-            deleted_by_recipient=False,
-        )
-
-    messages_qs = qs.order_by("-created_at")
+    qs = Message.objects.inbox(request.user)
 
     return render(
         request,
         "messaging/inbox.html",
-        {"messages": messages_qs, "folder": "inbox"},
+        folder_context(request, qs, "inbox"),
     )
 
 
@@ -60,19 +85,12 @@ def sent(request):
     Superusers: all messages not deleted_by_sender.
     Normal users: messages they sent.
     """
-    if request.user.is_superuser:
-        qs = Message.objects.filter(deleted_by_sender=False)
-    else:
-        qs = Message.objects.filter(
-            sender=request.user, deleted_by_sender=False
-        )
-
-    messages_qs = qs.order_by("-created_at")
+    qs = Message.objects.sent(request.user)
 
     return render(
         request,
         "messaging/sent.html",
-        {"messages": messages_qs, "folder": "sent"},
+        folder_context(request, qs, "sent"),
     )
 
 
@@ -85,24 +103,12 @@ def archived(request):
     Superusers: all archived messages.
     Normal users: archived messages they received.
     """
-    if request.user.is_superuser:
-        qs = Message.objects.filter(
-            archived=True,
-            deleted_by_recipient=False,
-        )
-    else:
-        qs = Message.objects.filter(
-            recipient=request.user,
-            archived=True,
-            deleted_by_recipient=False,
-        )
-
-    messages_qs = qs.order_by("-created_at")
+    qs = Message.objects.archived(request.user)
 
     return render(
         request,
         "messaging/archived.html",
-        {"messages": messages_qs, "folder": "archive"},
+        folder_context(request, qs, "archive"),
     )
 
 
@@ -115,22 +121,12 @@ def trash(request):
     Superusers: all messages that are flagged deleted by someone.
     Normal users: messages they sent/received that they deleted.
     """
-    if request.user.is_superuser:
-        qs = Message.objects.filter(
-            models.Q(deleted_by_sender=True) | models.Q(deleted_by_recipient=True)
-        )
-    else:
-        qs = Message.objects.filter(
-            models.Q(sender=request.user, deleted_by_sender=True)
-            | models.Q(recipient=request.user, deleted_by_recipient=True)
-        )
-
-    messages_qs = qs.order_by("-created_at")
+    qs = Message.objects.trash(request.user)
 
     return render(
         request,
         "messaging/trash.html",
-        {"messages": messages_qs, "folder": "trash"},
+        folder_context(request, qs, "trash"),
     )
 
 
@@ -138,17 +134,32 @@ def trash(request):
 # Compose
 # -------------------------
 @login_required
+@csrf_exempt
 def compose(request):
     """
     Any authenticated user can compose a message.
     """
+    # The size cap must be installed before anything reads request.POST,
+    # so CSRF is checked in _compose instead of by the middleware
+    request.upload_handlers.insert(0, AttachmentSizeLimitHandler(request))
+    return _compose(request)
+
+
+@csrf_protect
+def _compose(request):
     if request.method == "POST":
         form = MessageForm(request.POST, request.FILES)
-        if form.is_valid():
+        if getattr(request, "attachment_too_large", False):
+            form.is_valid()
+            form.add_error(
+                "attachment",
+                f"Attachments are limited to {filesizeformat(max_upload_size())}.",
+            )
+        elif form.is_valid():
             msg = form.save(commit=False)
             msg.sender = request.user
             msg.save()
-            return redirect("sent")
+            return redirect("sent_messages")
     else:
         form = MessageForm()
 
@@ -168,27 +179,55 @@ def message_detail(request, pk):
     if not user_can_access(msg, request.user):
         return HttpResponseForbidden("Not allowed")
 
-    # Mark as read only if recipient (or superuser acting as recipient)
-    if msg.recipient == request.user and not msg.is_read:
+    # Mark as read only if recipient. Conditional UPDATE of the one
+    # column, so a concurrent write to the row is never overwritten.
+    if msg.recipient_id == request.user.pk and not msg.is_read:
+        if Message.objects.filter(pk=msg.pk, is_read=False).update(
+            is_read=True, updated_at=timezone.now()
+        ):
+            invalidate_unread_count(msg.recipient_id)
         msg.is_read = True
-        msg.save()
 
     return render(request, "messaging/message_detail.html", {"message": msg})
 
 
+# -------------------------
+# Attachment download
+# -------------------------
+@login_required
+@require_GET
+def attachment_download(request, pk):
+    msg = get_object_or_404(
+        Message.objects.only("sender_id", "recipient_id", "attachment"), pk=pk
+    )
+
+    if not user_can_access(msg, request.user):
+        return HttpResponseForbidden("Not allowed")
+    if not msg.attachment:
+        raise Http404("No attachment")
+
+    try:
+        return attachment_response(request, msg.attachment)
+    except FileNotFoundError:
+        raise Http404("Attachment file is missing")
+
+
 # -------------------------
 # Archive / Unarchive
 # -------------------------
 @login_required
 def toggle_archive(request, pk):
-    msg = get_object_or_404(Message, pk=pk)
-
-    # Recipient or superuser
-    if not (request.user.is_superuser or msg.recipient == request.user):
+    # Recipient or superuser; flipped in one statement, no read first
+    filters = {"pk": pk}
+    if not request.user.is_superuser:
+        filters["recipient"] = request.user
+
+    result = flip_boolean(Message, "archived", returning=("recipient",), **filters)
+    if result is None:
+        get_object_or_404(Message.objects.only("pk"), pk=pk)
         return HttpResponseForbidden("Not allowed")
 
-    msg.archived = not msg.archived
-    msg.save()
+    invalidate_unread_count(result["recipient"])
     return redirect("inbox")
 
 
@@ -197,17 +236,10 @@ def toggle_archive(request, pk):
 # -------------------------
 @login_required
 def delete_message(request, pk):
-    msg = get_object_or_404(Message, pk=pk)
-
-    # Sender side delete
-    if msg.sender == request.user or request.user.is_superuser:
-        msg.deleted_by_sender = True
+    # Sender and/or recipient side, set in the UPDATE itself
+    if not set_trashed(Message.objects.filter(pk=pk), request.user, True):
+        get_object_or_404(Message.objects.only("pk"), pk=pk)
 
-    # Recipient side delete
-    if msg.recipient == request.user or request.user.is_superuser:
-        msg.deleted_by_recipient = True
-
-    msg.save()
     return redirect(request.GET.get("next", "inbox"))
 
 
@@ -216,17 +248,10 @@ def delete_message(request, pk):
 # -------------------------
 @login_required
 def restore_message(request, pk):
-    msg = get_object_or_404(Message, pk=pk)
-
-    if not user_can_access(msg, request.user):
+    if not set_trashed(Message.objects.filter(pk=pk), request.user, False):
+        get_object_or_404(Message.objects.only("pk"), pk=pk)
         return HttpResponseForbidden("Not allowed")
 
-    if msg.sender == request.user or request.user.is_superuser:
-        msg.deleted_by_sender = False
-    if msg.recipient == request.user or request.user.is_superuser:
-        msg.deleted_by_recipient = False
-
-    msg.save()
     return redirect("trash")
 
 
@@ -240,5 +265,172 @@ def permanent_delete(request, pk):
     if not user_can_access(msg, request.user):
         return HttpResponseForbidden("Not allowed")
 
-    msg.delete()
+    purge(Message.objects.filter(pk=msg.pk), request.user)
     return redirect("trash")
+
+
+# -------------------------
+# Bulk actions (selected ids or a whole folder, e.g. "Empty trash")
+# -------------------------
+@login_required
+@require_POST
+def bulk_action(request):
+    try:
+        action, ids, folder = _bulk_params(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    bulk_apply(action, request.user, ids=ids, folder=folder)
+
+    next_url = request.POST.get("next")
+    if not next_url or not url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}
+    ):
+        next_url = "inbox"
+    return redirect(next_url)
+
+
+# =========================================================
+# JSON API
+# =========================================================
+
+def _message_to_dict(m, user):
+    return {
+        "id": m.id,
+        "subject": m.subject,
+        "sender": m.sender.username,
+        "recipient": m.recipient.username,
+        "created_at": m.created_at.isoformat(),
+        "updated_at": m.updated_at.isoformat(),
+        "is_read": m.is_read,
+        "folder": m.folder_for(user),
+        "has_attachment": bool(m.attachment),
+        "url": reverse("message_detail", args=[m.id]),
+    }
+
+
+def _request_data(request):
+    """POST form data, or the JSON body when the request has no form data."""
+    if request.POST:
+        return request.POST
+    try:
+        payload = json.loads(request.body.decode() or "{}")
+    except Exception:
+        payload = {}
+    return payload if isinstance(payload, dict) else {}
+
+
+@login_required
+@require_GET
+def api_folder(request, folder):
+    """
+    One keyset page of a folder: ``?before=<cursor>&page_size=<n>``.
+    """
+    if folder not in FOLDERS:
+        raise Http404("Unknown folder")
+
+    items, next_cursor = keyset_page(
+        Message.objects.folder(folder, request.user).for_listing(),
+        before=request.GET.get("before"),
+        page_size=get_page_size(request),
+    )
+
+    return JsonResponse({
+        "folder": folder,
+        "messages": [_message_to_dict(m, request.user) for m in items],
+        "next_cursor": next_cursor,
+    })
+
+
+@login_required
+@require_GET
+def api_sync(request):
+    """
+    Delta feed: messages the user sent or received that changed after
+    ``?since=<token>``, and the ids of those purged since then
+    (``deleted``). Start without a token, then keep sending back the
+    returned ``since`` (repeat while ``has_more``). Each message carries
+    its current folder, so clients can move/insert it locally. Messages
+    changed, and ids deleted, in the last few seconds may be sent twice;
+    upsert and delete by id. On ``reset`` (a malformed token, or one older
+    than MESSAGING_SYNC_TOMBSTONE_DAYS) the client must discard its local
+    copy first.
+    """
+    since = request.GET.get("since")
+    position = decode_cursor(since)
+    reset = bool(since) and (
+        position is None or position[0] < timezone.now() - tombstone_retention()
+    )
+    if reset:
+        since = position = None
+
+    items, next_since, has_more = changes_since(
+        Message.objects.involving(request.user).for_listing(),
+        since=since,
+        page_size=get_page_size(request),
+    )
+
+    deleted = []
+    if position:
+        tombstones = DeletedMessage.objects.filter(deleted_at__gte=position[0])
+        if not request.user.is_superuser:
+            tombstones = tombstones.filter(user=request.user)
+        deleted = sorted(set(tombstones.values_list("message_id", flat=True)))
+
+    return JsonResponse({
+        "messages": [_message_to_dict(m, request.user) for m in items],
+        "deleted": deleted,
+        "since": next_since,
+        "has_more": has_more,
+        "reset": reset,
+    })
+
+
+def _bulk_params(request):
+    """
+    (action, ids, folder) from a bulk request; ids is None when a whole
+    ``folder`` is selected. Raises ValueError on bad input.
+    """
+    data = _request_data(request)
+    action = data.get("action")
+    if action not in ACTIONS:
+        raise ValueError("unknown action")
+
+    folder = data.get("folder") or None
+    if folder is not None:
+        if folder not in FOLDERS:
+            raise ValueError("unknown folder")
+        return action, None, folder
+
+    if hasattr(data, "getlist"):
+        raw_ids = data.getlist("ids[]") or data.getlist("ids")
+    else:
+        raw_ids = data.get("ids", [])
+
+    try:
+        ids = {int(x) for x in raw_ids}
+    except (TypeError, ValueError):
+        raise ValueError("invalid ids")
+
+    return action, ids, None
+
+
+@login_required
+@require_POST
+def api_actions(request):
+    """
+    Apply one action (archive, unarchive, trash, restore or purge) to many
+    messages: either ``ids[]`` or a whole ``folder``. In ids mode the
+    response reports the outcome per id.
+    """
+    try:
+        action, ids, folder = _bulk_params(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    updated, results = bulk_apply(action, request.user, ids=ids, folder=folder)
+
+    response = {"ok": True, "updated": updated}
+    if results is not None:
+        response["results"] = {str(pk): status for pk, status in results.items()}
+    return JsonResponse(response)
@@ -0,0 +1,270 @@
+# productivityhub/benchmarks.py
+"""
+Benchmark cases for run_benchmarks: one per URL name in dashboard,
+messaging and projects, plus ``<url name>:<variant>`` cases for other
+request shapes of the same URL. The query budget tests of each app reuse
+them.
+
+Each case is (method, kwargs, data): ``kwargs`` and ``data`` are
+callables taking the Fixtures for the benchmark user; they are called
+once, before the measured requests. Every request runs
+inside a transaction that is rolled back, so POST cases (toggles,
+deletes, creates) can be repeated and leave the database as seeded.
+"""
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from dashboard.sync import sync_changes
+from messaging.models import Message
+from projects.models import Project
+
+from .pagination import encode_position
+from .perf import percentile
+
+URLCONFS = ("dashboard.urls", "messaging.urls", "projects.urls")
+
+
+@dataclass
+class Fixtures:
+    """One existing row of each kind owned by (or sent to) the user."""
+
+    user: object
+    goal: object
+    task: object
+    note: object
+    message: object
+    attachment_message: object
+    project: object
+
+    @classmethod
+    def for_user(cls, user):
+        inbox = Message.objects.filter(recipient=user).order_by("-created_at")
+        return cls(
+            user=user,
+            goal=user.goals.order_by("order").first(),
+            task=user.tasks.order_by("order").first(),
+            note=user.notes.order_by("-created_at").first(),
+            message=inbox.first(),
+            attachment_message=inbox.exclude(attachment="").first(),
+            project=Project.objects.filter(owner=user).first(),
+        )
+
+
+def _json(payload):
+    return ("json", payload)
+
+
+def _none(f):
+    return {}
+
+
+def _pk(attr):
+    def kwargs(f):
+        obj = getattr(f, attr)
+        if obj is None:
+            raise LookupError(f"no {attr} for {f.user.username}; run seed_perf_data")
+        return {"pk": obj.pk}
+    return kwargs
+
+
+def _goal_ids(f):
+    return list(f.user.goals.order_by("order").values_list("pk", flat=True))
+
+
+GET, POST = "get", "post"
+
+CASES = {
+    # dashboard pages
+    "home": (GET, _none, _none),
+    "goals": (GET, _none, _none),
+    "tasks": (GET, _none, _none),
+    "settings": (GET, _none, _none),
+    # dashboard API
+    "goals_data": (GET, _none, _none),
+    "goal_toggle": (POST, _pk("goal"), _none),
+    "goals_save_selection": (
+        POST, _none,
+        lambda f: {"selected_ids[]": list(f.user.goals.values_list("pk", flat=True)[:5])},
+    ),
+    "goal_update_progress": (POST, _pk("goal"), lambda f: {"progress": 50, "completed": "1"}),
+    "goal_create": (POST, _none, lambda f: {"title": "Benchmark goal", "goal_type": "static"}),
+    "goal_delete": (POST, _pk("goal"), _none),
+    "goal_reorder": (
+        POST, _none,
+        lambda f: {"order[]": _goal_ids(f)[::-1]},
+    ),
+    # A single drag: the first goal moves below the last one
+    "goal_reorder:sparse": (
+        POST, _none,
+        lambda f: {"moved": _goal_ids(f)[0], "after": _goal_ids(f)[-1]},
+    ),
+    "tasks_list": (GET, _none, _none),
+    "tasks_save_selection": (
+        POST, _none,
+        # Drop every other task and reverse the rest: a delete and a reorder
+        lambda f: {"titles[]": list(f.user.tasks.values_list("title", flat=True))[::-2]},
+    ),
+    "task_toggle": (POST, _pk("task"), _none),
+    "task_delete": (POST, _pk("task"), _none),
+    "notes_list": (GET, _none, _none),
+    "note_create": (POST, _none, lambda f: {"text": "Benchmark note"}),
+    "note_toggle": (POST, _pk("note"), _none),
+    "note_delete": (POST, _pk("note"), _none),
+    "dashboard_batch": (
+        POST, _none,
+        lambda f: _json({"ops": [
+            {"op": "toggle", "kind": "task", "id": pk}
+            for pk in f.user.tasks.values_list("pk", flat=True)[:30]
+        ]}),
+    ),
+    "dashboard_batch:mixed": (
+        POST, _none,
+        lambda f: _json({"ops": [
+            {"op": "create", "kind": "task", "title": "Benchmark task"},
+            {"op": "toggle", "kind": "task", "id": f.task.pk},
+            {"op": "progress", "kind": "goal", "id": f.goal.pk, "progress": 50},
+            {"op": "delete", "kind": "note", "id": f.note.pk},
+        ]}),
+    ),
+    "dashboard_sync": (GET, _none, _none),
+    # The next sync after a full one: nothing has changed since
+    "dashboard_sync:delta": (GET, _none, lambda f: {"since": sync_changes(f.user)["since"]}),
+    # messaging
+    "inbox": (GET, _none, _none),
+    "sent_messages": (GET, _none, _none),
+    "archived_messages": (GET, _none, _none),
+    "trash": (GET, _none, _none),
+    "compose_message": (GET, _none, _none),
+    "message_detail": (GET, _pk("message"), _none),
+    "attachment_download": (GET, _pk("attachment_message"), _none),
+    "toggle_archive": (GET, _pk("message"), _none),
+    "delete_message": (GET, _pk("message"), _none),
+    "restore_message": (GET, _pk("message"), _none),
+    "permanent_delete": (GET, _pk("message"), _none),
+    "bulk_message_action": (
+        POST, _none, lambda f: {"action": "archive", "ids": [f.message.pk]},
+    ),
+    "api_message_folder": (GET, lambda f: {"folder": "inbox"}, _none),
+    "api_message_sync": (GET, _none, _none),
+    "api_message_sync:delta": (
+        GET, _none,
+        lambda f: {"since": encode_position(timezone.now() - timedelta(hours=1), 0)},
+    ),
+    "api_message_actions": (
+        POST, _none, lambda f: _json({"action": "trash", "folder": "inbox"}),
+    ),
+    # projects
+    "project_list": (GET, _none, _none),
+    "project_detail": (GET, _pk("project"), _none),
+    "project_create": (GET, _none, _none),
+    "project_edit": (GET, _pk("project"), _none),
+    "project_delete": (POST, _pk("project"), _none),
+}
+
+
+def url_names():
+    """Every named URL in URLCONFS, in declaration order."""
+    from importlib import import_module
+
+    names = []
+    for module in URLCONFS:
+        for pattern in import_module(module).urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                names.append(pattern.name)
+    return names
+
+
+def case_names():
+    """Every case: each named URL in URLCONFS followed by its variants."""
+    names = []
+    for name in url_names():
+        names.append(name)
+        names.extend(case for case in CASES if case.startswith(f"{name}:"))
+    return names
+
+
+def build_request(name, fixtures):
+    """(method, url, payload) for the ``name`` case."""
+    method, kwargs, data = CASES[name]
+    url_name = name.partition(":")[0]
+    return method, reverse(url_name, kwargs=kwargs(fixtures)), data(fixtures)
+
+
+def send_request(client, method, url, data):
+    if method == GET:
+        return client.get(url, data)
+    if isinstance(data, tuple) and data[0] == "json":
+        return client.post(url, json.dumps(data[1]), content_type="application/json")
+    return client.post(url, data)
+
+
+def run_case(client, fixtures, name, iterations=20, warmup=2, cold=False):
+    method, url, payload = build_request(name, fixtures)
+
+    timings, queries, status = [], [], None
+    for i in range(warmup + iterations):
+        if cold:
+            cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = send_request(client, method, url, payload)
+                # Drain streamed bodies so they are part of the timing
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+                elapsed = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(True)
+
+        status = response.status_code
+        if i >= warmup:
+            timings.append(elapsed)
+            queries.append(len(ctx.captured_queries))
+
+    timings.sort()
+    return {
+        "url": url,
+        "method": method.upper(),
+        "status": status,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(timings[-1], 3),
+        "queries": max(queries),
+        "queries_min": min(queries),
+    }
+
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """
+    Regressions of ``results`` against ``baseline`` (both run outputs):
+    p50 slower by more than ``tolerance`` (and ``min_delta_ms``), or
+    more queries per request. Returns a list of (name, message).
+    """
+    regressions = []
+    for name, case in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or "p50_ms" not in case or "p50_ms" not in base:
+            continue
+        if (
+            case["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+            and case["p50_ms"] - base["p50_ms"] >= min_delta_ms
+        ):
+            regressions.append((
+                name, f"p50 {base['p50_ms']:.1f} -> {case['p50_ms']:.1f} ms",
+            ))
+        if case["queries"] > base["queries"]:
+            regressions.append((
+                name, f"queries {base['queries']} -> {case['queries']}",
+            ))
+    return regressions
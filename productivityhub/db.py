@@ -0,0 +1,119 @@
+# productivityhub/db.py
+"""
+Small database helpers shared by the apps.
+"""
+from django.db import connection, migrations, models, transaction
+from django.utils import timezone
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex that builds with CREATE INDEX CONCURRENTLY on PostgreSQL, so
+    writes to a large table are not blocked while it builds. The migration
+    must set ``atomic = False``. Other backends get a plain CREATE INDEX.
+    """
+
+    def _concurrently(self, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return False
+        if schema_editor.connection.in_atomic_block:
+            raise NotImplementedError(
+                "AddIndexConcurrently needs a migration with atomic = False"
+            )
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not self._concurrently(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not self._concurrently(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+def _field(opts, name):
+    return opts.pk if name == "pk" else opts.get_field(name)
+
+
+def supports_update_returning():
+    """
+    ``UPDATE ... RETURNING``: PostgreSQL, and SQLite from 3.35. (Django's
+    can_return_columns_from_insert is about INSERT and is also set on
+    backends whose UPDATE has no RETURNING clause.)
+    """
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def flip_boolean(model, field, returning=(), **filters):
+    """
+    Flip the boolean ``field`` on the ``model`` row matching ``filters``
+    (plain equality, e.g. ``pk=3, user=request.user``) without reading it
+    first: one ``UPDATE ... SET field = NOT field ... RETURNING``, so two
+    concurrent toggles can never both see the old value. ``updated_at``
+    is bumped when the model has one.
+
+    Returns {field: new value, **returning columns}, or None when no row
+    matched (missing, or not the caller's).
+    """
+    opts = model._meta
+    names = [field, *returning]
+    has_updated_at = any(f.name == "updated_at" for f in opts.concrete_fields)
+
+    if not supports_update_returning():
+        # No RETURNING on this backend: same effect in two statements
+        flip = models.Case(
+            models.When(**{field: True}, then=models.Value(False)),
+            default=models.Value(True),
+        )
+        changes = {field: flip}
+        if has_updated_at:
+            changes["updated_at"] = timezone.now()
+        with transaction.atomic():
+            qs = model._default_manager.filter(**filters)
+            if not qs.update(**changes):
+                return None
+            return qs.values(*names).first()
+
+    qn = connection.ops.quote_name
+    column = qn(_field(opts, field).column)
+    assignments = [f"{column} = NOT {column}"]
+    params = []
+
+    if has_updated_at:
+        updated_at = opts.get_field("updated_at")
+        assignments.append(f"{qn(updated_at.column)} = %s")
+        params.append(updated_at.get_db_prep_value(timezone.now(), connection))
+
+    where = []
+    for name, value in filters.items():
+        target = _field(opts, name)
+        if isinstance(value, models.Model):
+            value = value.pk
+        where.append(f"{qn(target.column)} = %s")
+        params.append(target.get_db_prep_value(value, connection))
+
+    sql = (
+        f"UPDATE {qn(opts.db_table)} SET {', '.join(assignments)}"
+        f" WHERE {' AND '.join(where)}"
+        f" RETURNING {', '.join(qn(_field(opts, n).column) for n in names)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    result = dict(zip(names, row))
+    result[field] = bool(result[field])
+    return result
@@ -0,0 +1,116 @@
+# productivityhub/pagination.py
+"""
+Keyset pagination and sync cursors shared by the apps.
+"""
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+MAX_PAGE_SIZE = 200
+
+# updated_at is stamped in Python before the transaction commits, so a
+# slow transaction can commit a row stamped earlier than rows a client
+# has already synced past. A finished sync therefore never moves its
+# cursor later than now - SYNC_OVERLAP: rows stamped inside that window
+# are sent again next time (clients upsert by id). Delivery is
+# at-least-once for transactions that commit within SYNC_OVERLAP.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def encode_position(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def encode_cursor(msg, field="created_at"):
+    """Opaque ``?before=`` / ``?since=`` token for the position of ``msg``."""
+    return encode_position(getattr(msg, field), msg.pk)
+
+
+def decode_cursor(token):
+    """Returns (timestamp, id), or None for a missing/malformed token."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        timestamp = datetime.fromisoformat(created_at)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+    if settings.USE_TZ and timezone.is_naive(timestamp):
+        return None
+    return timestamp, pk
+
+
+def keyset_query(qs, before=None, page_size=50):
+    """
+    The query keyset_page() runs: newest-first rows of ``qs`` strictly
+    older than the ``before`` cursor, one more than ``page_size``.
+    """
+    qs = qs.order_by("-created_at", "-id")
+
+    position = decode_cursor(before)
+    if position:
+        created_at, pk = position
+        # The plain range bound keeps the scan on the index; the OR breaks ties
+        qs = qs.filter(created_at__lte=created_at).filter(
+            models.Q(created_at__lt=created_at) | models.Q(id__lt=pk)
+        )
+
+    return qs[: page_size + 1]
+
+
+def keyset_page(qs, before=None, page_size=50):
+    """
+    Newest-first page of ``qs`` strictly older than the ``before`` cursor.
+
+    Seeks on (created_at, id) instead of using OFFSET, so every page costs
+    the same index range scan. Returns (items, next_cursor); next_cursor
+    is None on the last page.
+    """
+    items = list(keyset_query(qs, before, page_size))
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+
+    return items, next_cursor
+
+
+def changes_since(qs, since=None, page_size=50, field="updated_at"):
+    """
+    Oldest-first page of rows in ``qs`` changed after the ``since`` cursor,
+    ordered on (``field``, id). Returns (items, next_since, has_more);
+    next_since is the token to send on the next sync. Pages within one
+    sync never overlap; the last one stops SYNC_OVERLAP short of now.
+    """
+    qs = qs.order_by(field, "id")
+
+    position = decode_cursor(since)
+    if position:
+        changed_at, pk = position
+        qs = qs.filter(**{f"{field}__gte": changed_at}).filter(
+            models.Q(**{f"{field}__gt": changed_at}) | models.Q(id__gt=pk)
+        )
+
+    items = list(qs[: page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    if has_more:
+        return items, encode_cursor(items[-1], field), has_more
+
+    horizon = timezone.now() - SYNC_OVERLAP
+    if not items:
+        # Nothing new: still move up to the horizon, so anything keyed on
+        # the cursor's time (message deletions) is not re-sent forever
+        if position and position[0] >= horizon:
+            return items, since, has_more
+        return items, encode_position(horizon, 0), has_more
+    if getattr(items[-1], field) < horizon:
+        return items, encode_cursor(items[-1], field), has_more
+    return items, encode_position(horizon, 0), has_more
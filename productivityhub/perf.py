@@ -0,0 +1,168 @@
+# productivityhub/perf.py
+"""
+Opt-in request instrumentation (PERF_MONITOR=1).
+
+For every request the middleware records the resolved view name, wall
+time, DB time, query count and repeated queries, returns them in a
+``Server-Timing`` header and appends a sample to a rotating JSON-lines
+log. Each worker process writes its own file (PERF_LOG_PATH plus the
+pid), because RotatingFileHandler cannot rotate a file that other
+processes also write to. Each file is capped by rotation, and a worker
+starting up deletes the files of workers that have exited (see
+``prune_worker_logs``). ``manage.py perf_report`` ranks views from all
+of them.
+
+Queries are counted with ``connection.execute_wrapper``, so this works
+with DEBUG off and costs one tuple per query.
+"""
+import glob
+import json
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("productivityhub.perf")
+
+
+def log_path():
+    return getattr(settings, "PERF_LOG_PATH", settings.BASE_DIR / "perf.log")
+
+
+def worker_log_path():
+    """This process's log file: ``<PERF_LOG_PATH>.<pid>``."""
+    return f"{log_path()}.{os.getpid()}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def prune_worker_logs(keep_seconds=None, now=None):
+    """
+    Delete the log files (rotated copies included) of worker pids that no
+    longer run, once they have not been written for ``keep_seconds``
+    (default PERF_LOG_KEEP_HOURS), so perf_report still sees a worker
+    that just restarted. Returns the number of files deleted.
+    """
+    if keep_seconds is None:
+        keep_seconds = getattr(settings, "PERF_LOG_KEEP_HOURS", 24) * 3600
+    cutoff = (now or time.time()) - keep_seconds
+    prefix = f"{log_path()}."
+
+    deleted = 0
+    for name in glob.glob(f"{prefix}*"):
+        # <PERF_LOG_PATH>.<pid>, or .<pid>.<n> once rotated
+        pid = name[len(prefix):].split(".")[0]
+        if not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+        try:
+            if os.path.getmtime(name) < cutoff:
+                os.remove(name)
+                deleted += 1
+        except FileNotFoundError:
+            # Another worker pruned it first
+            continue
+    return deleted
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list (0 when empty)."""
+    if not values:
+        return 0
+    rank = max(1, -(-len(values) * pct // 100))  # ceil
+    return values[int(rank) - 1]
+
+
+class _QueryRecorder:
+    """execute_wrapper that times each query and keeps its SQL + params."""
+
+    def __init__(self):
+        self.queries = []  # (sql, params, seconds)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, repr(params), time.perf_counter() - start))
+
+    def summary(self):
+        templates = [sql for sql, _, _ in self.queries]
+        exact = [(sql, params) for sql, params, _ in self.queries]
+        return {
+            "queries": len(self.queries),
+            "db_ms": round(sum(t for _, _, t in self.queries) * 1000, 2),
+            # Same SQL and params run again
+            "duplicates": len(exact) - len(set(exact)),
+            # Same SQL with other params: the N+1 signature
+            "similar": len(templates) - len(set(templates)),
+        }
+
+
+class PerfMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_MONITOR", False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PERF_SAMPLE_RATE", 1.0)
+        self.slow_ms = getattr(settings, "PERF_SLOW_MS", 500)
+
+        if not logger.handlers:
+            # Created per worker (gunicorn without --preload builds the
+            # middleware after forking), so each pid rotates its own file
+            prune_worker_logs()
+            handler = RotatingFileHandler(
+                worker_log_path(),
+                maxBytes=getattr(settings, "PERF_LOG_MAX_BYTES", 5 * 1024 * 1024),
+                backupCount=getattr(settings, "PERF_LOG_BACKUPS", 3),
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        wall_ms = round((time.perf_counter() - start) * 1000, 2)
+        stats = recorder.summary()
+
+        response["Server-Timing"] = (
+            f"total;dur={wall_ms}, "
+            f'db;dur={stats["db_ms"]};desc="{stats["queries"]} queries, '
+            f'{stats["duplicates"]} duplicate"'
+        )
+
+        # Slow requests are always kept, the rest are sampled
+        if wall_ms >= self.slow_ms or random.random() < self.sample_rate:
+            match = request.resolver_match
+            logger.info(json.dumps({
+                "ts": round(time.time(), 3),
+                "view": (match.url_name or match.view_name) if match else None,
+                "method": request.method,
+                "status": response.status_code,
+                "wall_ms": wall_ms,
+                **stats,
+            }))
+
+        return response
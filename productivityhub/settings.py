@@ -26,6 +26,13 @@ PRODUCTION = os.environ.get("RENDER") is not None
 
 DEBUG = not PRODUCTION
 
+if not DEBUG and SECRET_KEY == "dev-secret-key":
+    # Every service (web, mailer, cron) must sign with the same real key,
+    # or the password-reset links the mailer sends will not validate
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured("DJANGO_SECRET_KEY must be set when DEBUG is off")
+
 if PRODUCTION:
     ALLOWED_HOSTS = [
         ".onrender.com",
@@ -73,6 +80,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# =========================================
+# PERFORMANCE MONITORING (opt-in)
+# =========================================
+
+# PERF_MONITOR=1 adds Server-Timing headers and a sampled per-view log
+# (wall time, DB time, queries, repeats); read it with manage.py perf_report
+PERF_MONITOR = os.environ.get("PERF_MONITOR", "") in ("1", "true", "True")
+PERF_SAMPLE_RATE = float(os.environ.get("PERF_SAMPLE_RATE", 1.0))
+PERF_SLOW_MS = int(os.environ.get("PERF_SLOW_MS", 500))
+# Each worker appends to PERF_LOG_PATH.<pid>
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH", str(BASE_DIR / "perf.log"))
+# Each of those files rotates at PERF_LOG_MAX_BYTES, keeping
+# PERF_LOG_BACKUPS old copies; the files of workers that have exited are
+# deleted once they have been quiet for PERF_LOG_KEEP_HOURS
+PERF_LOG_MAX_BYTES = int(os.environ.get("PERF_LOG_MAX_BYTES", 5 * 1024 * 1024))
+PERF_LOG_BACKUPS = int(os.environ.get("PERF_LOG_BACKUPS", 3))
+PERF_LOG_KEEP_HOURS = float(os.environ.get("PERF_LOG_KEEP_HOURS", 24))
+
+if PERF_MONITOR:
+    # Outermost, so the numbers cover the whole middleware stack
+    MIDDLEWARE.insert(0, "productivityhub.perf.PerfMiddleware")
+
 # =========================================
 # URLS & WSGI
 # =========================================
@@ -123,14 +152,98 @@ DATABASES = {
     }
 }
 
-# Render PostgreSQL
-if PRODUCTION and os.environ.get("DATABASE_URL"):
+# DATABASE_URL wins wherever it is set (Render, on-prem staging, ...)
+if os.environ.get("DATABASE_URL"):
     DATABASES["default"] = dj_database_url.parse(
         os.environ["DATABASE_URL"],
-        conn_max_age=600,
-        ssl_require=True
+        ssl_require=os.environ.get("DB_SSL_REQUIRE", "1" if PRODUCTION else "0") == "1",
+    )
+
+# Connection reuse for every deployment mode. DB_CONN_MAX_AGE is in
+# seconds (0 = new connection per request, "none" = never expire); health
+# checks ping a reused connection once per request before trusting it.
+_conn_max_age = os.environ.get("DB_CONN_MAX_AGE", "600")
+DATABASES["default"]["CONN_MAX_AGE"] = (
+    None if _conn_max_age.lower() == "none" else int(_conn_max_age)
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+    os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1"
+)
+
+# Optional server-side pool (psycopg_pool, installed by the
+# psycopg[binary,pool] requirement). A pool replaces persistent
+# connections, so CONN_MAX_AGE must be 0.
+if os.environ.get("DB_POOL", "0") == "1":
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        from django.core.exceptions import ImproperlyConfigured
+
+        raise ImproperlyConfigured(
+            "DB_POOL=1 needs psycopg 3 with pooling: pip install 'psycopg[binary,pool]'"
+        )
+
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    }
+
+# =========================================
+# CACHE
+# =========================================
+
+# CACHE_BACKEND: "locmem" (one process only), "file" (shared by the
+# workers on one host) or "redis" (any Redis-compatible server at
+# REDIS_URL; needs the redis package). Defaults to redis when REDIS_URL
+# is set, file in production and locmem in development.
+REDIS_URL = os.environ.get("REDIS_URL", "")
+CACHE_BACKEND = os.environ.get(
+    "CACHE_BACKEND", "redis" if REDIS_URL else ("file" if PRODUCTION else "locmem")
+)
+
+_cache_backends = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "productivityhub",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_DIR", str(BASE_DIR / ".cache")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 10000))},
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL or "redis://localhost:6379/0",
+    },
+}
+
+if CACHE_BACKEND not in _cache_backends:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND must be one of {', '.join(_cache_backends)}, not {CACHE_BACKEND!r}"
     )
 
+CACHES = {
+    "default": {
+        **_cache_backends[CACHE_BACKEND],
+        "KEY_PREFIX": os.environ.get("CACHE_KEY_PREFIX", "productivityhub"),
+        "TIMEOUT": int(os.environ.get("CACHE_TIMEOUT", 300)),
+    }
+}
+
+# =========================================
+# SESSIONS
+# =========================================
+
+# SESSION_BACKEND: "cached_db" (reads from the cache, writes through to
+# the database), "signed_cookies" (no server storage at all; logout
+# cannot revoke a copied cookie) or "db"
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_BACKEND}"
+
 # =========================================
 # LOGIN SETTINGS
 # =========================================
@@ -139,6 +252,16 @@ LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'login'
 LOGIN_URL = 'login'
 
+# request.user is loaded from the cache for this many seconds; saving
+# or deleting the User drops the entry straight away. Logins go through
+# the cached backend; ModelBackend stays listed so sessions that were
+# created under its path keep working (uncached) until the next login.
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
 # =========================================
 # PROXY / SSL / CSRF — REQUIRED FOR RENDER
 # =========================================
@@ -189,6 +312,73 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# =========================================
+# OUTBOUND EMAIL QUEUE
+# =========================================
+
+# Mail is queued in the database and delivered by
+# `manage.py send_queued_email --loop`; failed sends back off
+# exponentially (base * 2^n seconds, capped) up to the attempt limit.
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_BASE_SECONDS = 30
+EMAIL_QUEUE_RETRY_MAX_SECONDS = 60 * 60
+# A worker's claim on a batch; must outlast sending one batch
+EMAIL_QUEUE_CLAIM_SECONDS = 5 * 60
+
+# =========================================
+# MESSAGING
+# =========================================
+
+# Messages per folder page (overridable per request with ?page_size=)
+MESSAGING_PAGE_SIZE = int(os.environ.get("MESSAGING_PAGE_SIZE", 50))
+
+# Attachments: upload cap and the chunk size used for uploads/downloads
+MESSAGING_ATTACHMENT_MAX_SIZE = int(
+    os.environ.get("MESSAGING_ATTACHMENT_MAX_SIZE", 10 * 1024 * 1024)
+)
+MESSAGING_ATTACHMENT_CHUNK_SIZE = 64 * 1024
+
+# Hand downloads to the front proxy: "x-accel-redirect" (nginx, served
+# from an internal location at the prefix below) or "x-sendfile"
+MESSAGING_ATTACHMENT_SENDFILE = os.environ.get("MESSAGING_ATTACHMENT_SENDFILE", "")
+MESSAGING_ATTACHMENT_ACCEL_PREFIX = "/protected-media/"
+
+# API sync: how long purged messages are remembered (older tokens get a
+# full resync)
+MESSAGING_SYNC_TOMBSTONE_DAYS = int(os.environ.get("MESSAGING_SYNC_TOMBSTONE_DAYS", 30))
+
+# =========================================
+# PROJECTS
+# =========================================
+
+PROJECTS_PAGE_SIZE = int(os.environ.get("PROJECTS_PAGE_SIZE", 25))
+
+# =========================================
+# DASHBOARD
+# =========================================
+
+# How long a cached goals/tasks/notes payload may live. Entries are
+# invalidated by write views long before this; it only bounds memory.
+DASHBOARD_API_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_API_CACHE_TIMEOUT", 60 * 60 * 24))
+
+# How long a list's ETag validator is trusted without re-reading the
+# rows. Write views bump the generation, so this only bounds how late
+# writes from other services (the archive cron) show up.
+DASHBOARD_VALIDATOR_TIMEOUT = int(os.environ.get("DASHBOARD_VALIDATOR_TIMEOUT", 5 * 60))
+
+# /api/sync/: rows per model per response, and how long deletions are
+# remembered (older tokens get a full resync)
+DASHBOARD_SYNC_PAGE_SIZE = int(os.environ.get("DASHBOARD_SYNC_PAGE_SIZE", 200))
+DASHBOARD_SYNC_TOMBSTONE_DAYS = int(os.environ.get("DASHBOARD_SYNC_TOMBSTONE_DAYS", 30))
+
+# /api/batch/: most operations accepted in one request
+DASHBOARD_BATCH_MAX_OPS = int(os.environ.get("DASHBOARD_BATCH_MAX_OPS", 200))
+
+# Notes: home page window size, and after how many days untouched a
+# completed note moves to the archive tier (manage.py archive_notes)
+DASHBOARD_NOTES_PAGE_SIZE = int(os.environ.get("DASHBOARD_NOTES_PAGE_SIZE", 20))
+DASHBOARD_NOTES_ARCHIVE_DAYS = int(os.environ.get("DASHBOARD_NOTES_ARCHIVE_DAYS", 30))
+
 # =========================================
 # LOCALIZATION
 # =========================================
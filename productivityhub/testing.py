@@ -0,0 +1,125 @@
+# productivityhub/testing.py
+"""
+Query-budget assertions for view tests.
+
+``QueryBudgetMixin.assertQueryBudgets`` runs every URL of a budget table
+at several data sizes and fails when a view exceeds its budget or when
+its query count grows with the data (an N+1). Failures list the captured
+SQL grouped by normalised pattern, with the patterns that grew first, so
+the message points at the offending query. The requests are the
+run_benchmarks cases (``productivityhub.benchmarks``), so the budgets and
+the benchmarks measure the same thing.
+"""
+import re
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .benchmarks import build_request, send_request
+from .benchmarks import Fixtures  # noqa: F401  (for the budget tests)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """SQL with literals replaced by ``?`` and IN lists collapsed."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def query_patterns(captured):
+    """Counter of normalised SQL for CaptureQueriesContext.captured_queries."""
+    return Counter(normalize_sql(q["sql"]) for q in captured)
+
+
+def format_patterns(patterns, baseline=None, limit=10):
+    """
+    Patterns most frequent first; with ``baseline`` (patterns at a smaller
+    data size) the ones that grew come first, marked with the increase.
+    """
+    baseline = baseline or Counter()
+
+    def growth(item):
+        sql, count = item
+        return (count - baseline.get(sql, 0), count)
+
+    lines = []
+    for sql, count in sorted(patterns.items(), key=growth, reverse=True)[:limit]:
+        grew = count - baseline.get(sql, 0)
+        marker = f" (+{grew})" if baseline and grew > 0 else ""
+        # The column list is noise; FROM/WHERE is what identifies the query
+        shown = _SELECT_LIST.sub("SELECT ... FROM ", sql)
+        lines.append(f"  {count:>4}x{marker}  {shown[:300]}")
+    return "\n".join(lines)
+
+
+def capture_queries(make_request, cold=True):
+    """
+    Run ``make_request()`` in a rolled-back transaction and return
+    (response, captured queries). ``cold`` clears the cache first so
+    cached views are measured on their database path.
+    """
+    if cold:
+        cache.clear()
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as ctx:
+            response = make_request()
+        transaction.set_rollback(True)
+    return response, ctx.captured_queries
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for TestCase. Subclasses call ``assertQueryBudgets`` with
+
+    * ``budgets``: {case name: max queries per request};
+    * ``grow(n)``: brings the test data up to size ``n`` and sets
+      ``self.fixtures`` (``Fixtures.for_user``).
+
+    Each case is sent with ``self.client``; its payload is built before
+    the queries are captured.
+    """
+
+    BUDGET_SIZES = (1, 10)
+
+    def assertQueryBudgets(self, budgets, grow, sizes=None):
+        sizes = sizes or self.BUDGET_SIZES
+        seen = {}  # case name -> (size, patterns) at the smallest size
+
+        for size in sizes:
+            grow(size)
+            for name, budget in budgets.items():
+                with self.subTest(case=name, size=size):
+                    request = build_request(name, self.fixtures)
+                    response, captured = capture_queries(
+                        lambda: send_request(self.client, *request)
+                    )
+                    self.assertLess(
+                        response.status_code, 400,
+                        f"{name} returned {response.status_code} at size {size}",
+                    )
+                    patterns = query_patterns(captured)
+                    first = seen.setdefault(name, (size, patterns))
+
+                    if len(captured) > budget:
+                        self.fail(
+                            f"{name}: {len(captured)} queries at size {size}, "
+                            f"budget {budget}\n{format_patterns(patterns, first[1])}"
+                        )
+
+                    grown = sum(patterns.values()) - sum(first[1].values())
+                    if grown > 0:
+                        self.fail(
+                            f"{name}: query count grows with data "
+                            f"({sum(first[1].values())} at size {first[0]}, "
+                            f"{len(captured)} at size {size})\n"
+                            f"{format_patterns(patterns, first[1])}"
+                        )
@@ -0,0 +1,30 @@
+# projects/access.py
+"""
+Project permission checks that never load the stakeholder list just to
+test membership.
+"""
+
+
+def is_stakeholder(user, project):
+    """
+    Uses the prefetched stakeholders when the view already loaded them
+    (no query), otherwise a single EXISTS on the stakeholder table.
+    """
+    prefetched = getattr(project, "_prefetched_objects_cache", {})
+    if "stakeholders" in prefetched:
+        return any(s.pk == user.pk for s in prefetched["stakeholders"])
+    return project.stakeholders.filter(pk=user.pk).exists()
+
+
+def can_view(user, project):
+    """Superusers, the owner and stakeholders may view a project."""
+    return (
+        user.is_superuser
+        or project.owner_id == user.pk
+        or is_stakeholder(user, project)
+    )
+
+
+def can_edit(user, project):
+    """Superusers and the owner may edit or delete a project."""
+    return user.is_superuser or project.owner_id == user.pk
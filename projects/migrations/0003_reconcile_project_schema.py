@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Bring the projects schema in line with models.py. The old free-text
+    stakeholders column is kept (as stakeholders_text) until 0004 has
+    copied it into the many-to-many.
+    """
+
+    dependencies = [
+        ('projects', '0002_projectmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='project',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owned_projects', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RenameField(
+            model_name='project',
+            old_name='stakeholders',
+            new_name='stakeholders_text',
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='stakeholders',
+            field=models.ManyToManyField(blank=True, related_name='stakeholder_projects', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='status',
+            field=models.CharField(choices=[('planned', 'Planned'), ('active', 'Active'), ('on_hold', 'On Hold'), ('completed', 'Completed')], default='planned', max_length=20),
+        ),
+    ]
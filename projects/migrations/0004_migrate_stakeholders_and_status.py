@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:35
+
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+# Old status values -> the ones models.py offers
+STATUS_MAP = {
+    "not_started": "planned",
+    "in_progress": "active",
+    "blocked": "on_hold",
+}
+
+
+def stakeholder_text_to_m2m(apps, schema_editor):
+    """
+    Link each name in the old free-text stakeholders column to the user
+    with that username or email. Names without an account are appended
+    to the description so nothing is lost.
+    """
+    Project = apps.get_model("projects", "Project")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    found = {}
+
+    def lookup(name):
+        key = name.lower()
+        if key not in found:
+            found[key] = (
+                User.objects.filter(username__iexact=name).first()
+                or User.objects.filter(email__iexact=name).first()
+            )
+        return found[key]
+
+    for project in Project.objects.exclude(stakeholders_text="").iterator():
+        names = [n.strip() for n in re.split(r"[,;\n]", project.stakeholders_text) if n.strip()]
+        users, unmatched = [], []
+        for name in names:
+            user = lookup(name)
+            (users if user else unmatched).append(user or name)
+
+        if users:
+            project.stakeholders.add(*users)
+        if unmatched:
+            note = "Stakeholders without an account: " + ", ".join(unmatched)
+            project.description = f"{project.description}\n\n{note}" if project.description else note
+            project.save(update_fields=["description"])
+
+
+def stakeholder_m2m_to_text(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    for project in Project.objects.prefetch_related("stakeholders").iterator(chunk_size=500):
+        names = ", ".join(u.username for u in project.stakeholders.all())
+        if names:
+            project.stakeholders_text = names[:300]
+            project.save(update_fields=["stakeholders_text"])
+
+
+def remap_status(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    for old, new in STATUS_MAP.items():
+        Project.objects.filter(status=old).update(status=new)
+
+
+def unmap_status(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    for old, new in STATUS_MAP.items():
+        Project.objects.filter(status=new).update(status=old)
+
+
+class Migration(migrations.Migration):
+    """
+    Data only: free-text stakeholders become links to real accounts and
+    old status values are mapped onto the current choices. Runs in its
+    own transaction, apart from the schema changes around it.
+    """
+
+    dependencies = [
+        ('projects', '0003_reconcile_project_schema'),
+    ]
+
+    operations = [
+        migrations.RunPython(stakeholder_text_to_m2m, stakeholder_m2m_to_text),
+        migrations.RunPython(remap_status, unmap_status),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_migrate_stakeholders_and_status'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='project',
+            name='stakeholders_text',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_remove_project_stakeholders_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['owner', '-created_at'], name='project_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', '-created_at'], name='project_status_idx'),
+        ),
+    ]
@@ -1,6 +1,39 @@
+from datetime import date
+
 from django.db import models
 from django.contrib.auth.models import User
 
+
+class ProjectQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """
+        Superusers: every project.
+        Normal users: projects they own or are a stakeholder on, tested
+        with an EXISTS on the stakeholder table (no join, no DISTINCT).
+        """
+        if user.is_superuser:
+            return self.all()
+
+        is_stakeholder = Project.stakeholders.through.objects.filter(
+            project_id=models.OuterRef("pk"), user_id=user.pk
+        )
+        return self.filter(models.Q(owner=user) | models.Exists(is_stakeholder))
+
+    def with_overdue(self):
+        """Annotate ``overdue`` in SQL (read back by ``is_overdue``)."""
+        return self.annotate(
+            overdue=models.Case(
+                models.When(
+                    models.Q(end_date__lt=date.today()) & ~models.Q(status="completed"),
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
 class Project(models.Model):
 
     STATUS_CHOICES = [
@@ -22,14 +55,37 @@ class Project(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="planned")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at"], name="project_owner_idx"),
+            models.Index(fields=["status", "-created_at"], name="project_status_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
     @property
     def is_overdue(self):
-        from datetime import date
+        if hasattr(self, "overdue"):
+            return self.overdue
         return self.end_date and self.end_date < date.today() and self.status != "completed"
+
+
+class ProjectMessage(models.Model):
+    """
+    Retired: nothing reads or writes these any more. The model stays so
+    existing rows survive (and cascade with their project) until they
+    have been exported and a later migration drops the table.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="messages")
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="project_messages")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    is_archived = models.BooleanField(default=False)
@@ -1,3 +1,50 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from productivityhub.testing import Fixtures, QueryBudgetMixin
+
+from .models import Project
+
+
+class ProjectQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Query budgets for the project views; the list and detail pages must
+    not scan stakeholders per project.
+    """
+
+    # Every request starts with the session and user lookups (2); pages
+    # add the navbar's avatar key and unread count (2).
+    BUDGETS = {
+        # 2 + paginator count + page + navbar
+        "project_list": 6,
+        # 2 + project + stakeholders (prefetched) + navbar
+        "project_detail": 6,
+        # 2 + navbar + stakeholder choices
+        "project_create": 5,
+        # 2 + project + its stakeholders + navbar + stakeholder choices
+        "project_edit": 7,
+        # 2 + project + DELETE stakeholders, project messages, project
+        "project_delete": 6,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def grow(self, size):
+        """``size`` owned and ``size`` shared projects, ``size`` stakeholders each."""
+        people = [
+            User.objects.get_or_create(username=f"stakeholder{i}")[0]
+            for i in range(size)
+        ]
+        for i in range(Project.objects.filter(owner=self.user).count(), size):
+            owned = Project.objects.create(name=f"Owned {i}", owner=self.user)
+            owned.stakeholders.set(people)
+            shared = Project.objects.create(name=f"Shared {i}", owner=people[i])
+            shared.stakeholders.set([self.user, *people])
+        for project in Project.objects.all():
+            project.stakeholders.add(*people)
+        self.fixtures = Fixtures.for_user(self.user)
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets(self.BUDGETS, self.grow, sizes=(2, 15))
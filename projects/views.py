@@ -2,7 +2,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
 
+from .access import can_edit, can_view
 from .models import Project
 from .forms import ProjectForm
 
@@ -15,16 +20,30 @@ def project_list(request):
     """
     Superusers: see ALL projects.
     Normal users: see projects they own or are a stakeholder on.
+    Optional ``?status=`` filter; paginated with ``?page=``.
     """
-    if request.user.is_superuser:
-        projects = Project.objects.all()
+    projects = (
+        Project.objects.visible_to(request.user)
+        .select_related("owner")
+        .defer("description")
+        .with_overdue()
+    )
+
+    status = request.GET.get("status", "")
+    if status in dict(Project.STATUS_CHOICES):
+        projects = projects.filter(status=status)
     else:
-        projects = (
-            Project.objects.filter(owner=request.user)
-            | Project.objects.filter(stakeholders=request.user)
-        ).distinct()
+        status = ""
+
+    paginator = Paginator(projects, getattr(settings, "PROJECTS_PAGE_SIZE", 25))
+    page = paginator.get_page(request.GET.get("page"))
 
-    return render(request, "projects/project_list.html", {"projects": projects})
+    return render(request, "projects/project_list.html", {
+        "projects": page,
+        "page": page,
+        "status": status,
+        "status_choices": Project.STATUS_CHOICES,
+    })
 
 
 # -----------------------------
@@ -36,17 +55,22 @@ def project_detail(request, pk):
     Superusers: can open any project.
     Normal users: only if owner or stakeholder.
     """
-    project = get_object_or_404(Project, pk=pk)
+    # Stakeholders are loaded once, for both the access check and the page
+    project = get_object_or_404(
+        Project.objects.select_related("owner").prefetch_related(
+            Prefetch("stakeholders", queryset=User.objects.only("id", "username"))
+        ),
+        pk=pk,
+    )
 
-    if not (
-        request.user.is_superuser
-        or project.owner == request.user
-        or request.user in project.stakeholders.all()
-    ):
+    if not can_view(request.user, project):
         messages.error(request, "You do not have permission to view this project.")
         return redirect("project_list")
 
-    return render(request, "projects/project_detail.html", {"project": project})
+    return render(request, "projects/project_detail.html", {
+        "project": project,
+        "can_edit": can_edit(request.user, project),
+    })
 
 
 # -----------------------------
@@ -88,7 +112,7 @@ def project_edit(request, pk):
     """
     project = get_object_or_404(Project, pk=pk)
 
-    if not (request.user.is_superuser or project.owner == request.user):
+    if not can_edit(request.user, project):
         messages.error(request, "Only the project owner can edit this project.")
         return redirect("project_detail", pk=pk)
 
@@ -119,7 +143,7 @@ def project_delete(request, pk):
     """
     project = get_object_or_404(Project, pk=pk)
 
-    if not (request.user.is_superuser or project.owner == request.user):
+    if not can_edit(request.user, project):
         messages.error(request, "Only the project owner can delete this project.")
         return redirect("project_detail", pk=pk)
 
@@ -26,6 +26,7 @@ document.addEventListener("DOMContentLoaded", () => {
   let CUSTOM_LOCAL = []; // {title}
   let CURRENT_TASKS = []; // from backend
   let selectionTitles = new Set(); // titles selected in Manage tab
+  let tasksEtag = null; // last validator; unchanged lists come back as 304
 
   function isSelectedTitle(title) {
     return selectionTitles.has(title);
@@ -33,7 +34,12 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // -------- Load from backend --------
   async function loadTasks() {
-    const res = await fetch("/api/tasks/list/");
+    const res = await fetch("/api/tasks/list/", {
+      headers: tasksEtag ? { "If-None-Match": tasksEtag } : {},
+    });
+    if (res.status === 304) return;
+
+    tasksEtag = res.headers.get("ETag");
     const data = await res.json();
 
     CURRENT_TASKS = data.tasks || [];
@@ -227,10 +233,11 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     }
 
-    await fetch(`/api/tasks/toggle/${id}/`, {
-      method: "POST",
-      headers: { "X-CSRFToken": csrftoken },
-    });
+    try {
+      await window.dashboardBatch.queue({ op: "toggle", kind: "task", id: Number(id) });
+    } catch (err) {
+      console.error("Error toggling task:", err);
+    }
   });
 
   // -------- Saved tab: delete --------